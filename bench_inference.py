@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark latency dan memory per worker: torch vs NumPy inference engine
+Each engine runs in a fresh process so cold start and RSS are per worker.
+"""
+
+import json
+import subprocess
+import sys
+
+WORKER_CODE = r'''
+import json, resource, sys, time
+engine, n_calls = sys.argv[1], int(sys.argv[2])
+start = time.perf_counter()
+import numpy as np
+if engine == "torch":
+    import torch
+    from model import load_artifact_model
+    model, data = load_artifact_model()
+    def predict(X):
+        with torch.no_grad():
+            return torch.softmax(model(torch.from_numpy(X)), dim=1).numpy()
+else:
+    from numpy_model import load_weights, softmax
+    data = load_weights()
+    model = data["model"]
+    def predict(X):
+        return softmax(model(X))
+cold_start = time.perf_counter() - start
+
+X = (np.random.default_rng(0).random((1, data["input_size"])) < 0.05).astype(np.float32)
+predict(X)
+start = time.perf_counter()
+for _ in range(n_calls):
+    predict(X)
+latency = (time.perf_counter() - start) / n_calls
+
+# ru_maxrss is in KiB on Linux
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({"cold_start": cold_start, "latency": latency, "rss_mb": rss_mb}))
+'''
+
+def run_engine(engine, n_calls):
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER_CODE, engine, str(n_calls)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def bench_inference(n_calls=5000):
+    print("⏱️  Benchmark: intent classifier inference per worker")
+    print("="*60)
+    print(f"{'engine':<8} {'cold start':>12} {'latency/msg':>14} {'peak RSS':>12}")
+    
+    for engine in ["torch", "numpy"]:
+        try:
+            result = run_engine(engine, n_calls)
+        except subprocess.CalledProcessError as e:
+            print(f"{engine:<8} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{engine:<8} {result['cold_start'] * 1000:>10.1f}ms "
+              f"{result['latency'] * 1e6:>12.1f}µs "
+              f"{result['rss_mb']:>10.1f}MB")
+
+if __name__ == "__main__":
+    bench_inference()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark dense NeuralNet vs EmbeddingBag SparseNeuralNet as the vocabulary grows
+"""
+
+import time
+
+import numpy as np
+import torch
+
+from model import NeuralNet, SparseNeuralNet
+from nltk_utils import SparseBagMatrix
+
+def random_bags(n_rows, vocab_size, active_words, rng):
+    indices = np.concatenate([
+        np.sort(rng.choice(vocab_size, size=active_words, replace=False))
+        for _ in range(n_rows)
+    ])
+    indptr = np.arange(n_rows + 1) * active_words
+    return SparseBagMatrix(indptr, indices, vocab_size)
+
+def time_per_call(fn, n_calls):
+    fn()
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        fn()
+    return (time.perf_counter() - start) / n_calls
+
+def bench_sparse_model(vocab_sizes=(100, 1000, 10000, 100000), batch_sizes=(1, 64),
+                       hidden_size=8, num_classes=11, active_words=6, n_calls=200):
+    print("⏱️  Benchmark: dense NeuralNet vs EmbeddingBag SparseNeuralNet (forward)")
+    print("="*60)
+    print(f"{'vocab':>8} {'batch':>6} {'dense':>12} {'sparse':>12} {'speedup':>9}")
+    
+    torch.set_grad_enabled(False)
+    rng = np.random.default_rng(0)
+    
+    for vocab_size in vocab_sizes:
+        dense_model = NeuralNet(vocab_size, hidden_size, num_classes).eval()
+        sparse_model = SparseNeuralNet(vocab_size, hidden_size, num_classes).eval()
+        
+        for batch_size in batch_sizes:
+            bags = random_bags(batch_size, vocab_size, active_words, rng)
+            
+            # both timings include building the model inputs from the bags
+            dense_time = time_per_call(
+                lambda: dense_model(torch.from_numpy(bags.to_dense())), n_calls)
+            sparse_time = time_per_call(
+                lambda: sparse_model(*bags.to_bag_inputs()), n_calls)
+            
+            print(f"{vocab_size:>8} {batch_size:>6} "
+                  f"{dense_time * 1e6:>10.1f}µs {sparse_time * 1e6:>10.1f}µs "
+                  f"{dense_time / sparse_time:>8.1f}x")
+
+if __name__ == "__main__":
+    bench_sparse_model()
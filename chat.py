@@ -1,103 +1,375 @@
+import os
 import random
 import json
 import re
+import threading
+import time
 
-import torch
+import numpy as np
 
-from model import NeuralNet
-from nltk_utils import bag_of_words, tokenize
+# "torch" serves data.bin in eager mode, memory-mapped so forked workers
+# share the weight pages, "torchscript" the quantized / frozen export of
+# export_model.py (checked for parity when it was written), "numpy" skips
+# torch entirely and serves data.bin too, it is also the fallback when
+# torch is not installed
+ENGINE = os.environ.get("CHAT_ENGINE", "torch")
+
+from model_artifact import ARTIFACT_FILE
+from numpy_model import load_weights, softmax
+from router import MessageRouter
+from geometry import find_shape, describe_shapes
+from formula_store import FormulaStore, find_store, remember_store, session_scope
+from nltk_utils import BagOfWordsEncoder, tokenize, seed_stem_cache
 from pdf_utils import extract_text_from_pdf, detect_pdf_path_in_message
 from math_utils import (
     process_pdf_with_math, 
     parse_user_math_input, 
     calculate_math_expression,
     translate_indonesian_to_english,
-    MathExpressionEvaluator
+    MathExpressionEvaluator,
+    check_result,
+    build_grid,
+    format_value_table,
+    formula_bindings,
+    summarize_values
 )
 
-device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+INTENTS_FILE = 'intents.json'
+FILE = ARTIFACT_FILE
+SERVING_FILE = "data_serving.pt"
+
+# Seconds one calculation may take before it is stopped with an error
+EVALUATION_TIMEOUT = float(os.environ.get("CHAT_EVAL_TIMEOUT", "1"))
+
+# Seconds between checks for a new model file, 0 turns hot reload off
+RELOAD_INTERVAL = float(os.environ.get("CHAT_RELOAD_INTERVAL", "5"))
+
+# torch, the model and intents.json are loaded by init(), on the first
+# message that needs them unless called earlier. Routed messages like
+# "calculate 2 + 3" never load them.
+torch = None
+device = None
+chat_model = None
+
+class ChatModel:
+    """
+    A trained model with everything derived from it: vocabulary, tags,
+    intents and lookup tables. get_responses reads the current ChatModel
+    once per call, so a reload swaps all of it at once while requests
+    are in flight.
+    """
+    def __init__(self, model, data, intents, signature):
+        self.model = model
+        self.model_type = data.get("model_type", "dense")
+        self.quantized = bool(data.get("quantized"))
+        self.all_words = data['all_words']
+        self.tags = data['tags']
+        self.intents = intents
+        self.signature = signature
+        self.bag_encoder = BagOfWordsEncoder(self.all_words)
+        self.exact_match_table = build_exact_match_table(self.tags, intents)
+        self.tag_table = build_tag_table(self.tags, intents, TAG_HANDLERS)
+
+def model_file():
+    """the file the current engine serves from"""
+    if torch is not None and ENGINE == "torchscript":
+        return SERVING_FILE
+    return FILE
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+def load_chat_model():
+    path = model_file()
+    signature = file_signature(path)
+
+    with open(INTENTS_FILE, 'r') as json_data:
+        intents = json.load(json_data)
+
+    if torch is not None and ENGINE == "torchscript":
+        from export_model import load_serving_model
+        model, data = load_serving_model(path)
+    elif torch is not None:
+        from model import load_artifact_model
+        model, data = load_artifact_model(path)
+        model = model.to(device)
+    else:
+        data = load_weights(path)
+        model = data["model"]
+
+    seed_stem_cache(data['all_words'])
+    return ChatModel(model, data, intents, signature)
+
+def load_engine():
+    """import torch for the torch / torchscript engines, None for numpy"""
+    global torch, device
+    if ENGINE in ("torch", "torchscript"):
+        try:
+            import torch
+        except ImportError:
+            torch = None
+    else:
+        torch = None
+
+    if torch is None:
+        device = None
+    elif ENGINE == "torchscript":
+        device = torch.device('cpu')
+    else:
+        device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    return torch
+
+_init_lock = threading.Lock()
+
+def init(engine=None):
+    """
+    Load the inference engine, the model and the intents. Happens on
+    the first message that needs them; call it at startup (or before
+    forking workers) to pay that cost up front. Passing an engine
+    switches to it and loads its model again.
+    """
+    global ENGINE, chat_model
+    with _init_lock:
+        if chat_model is not None and engine in (None, ENGINE):
+            return chat_model
+        if engine is not None:
+            ENGINE = engine
+        load_engine()
+        chat_model = load_chat_model()
+        return chat_model
 
-with open('intents.json', 'r') as json_data:
-    intents = json.load(json_data)
+def get_chat_model():
+    """the current ChatModel, loaded on first use"""
+    current = chat_model
+    if current is None:
+        current = init()
+    return current
 
-FILE = "data.pth"
-data = torch.load(FILE)
+_reload_lock = threading.Lock()
+_last_reload_check = 0.0
 
-input_size = data["input_size"]
-hidden_size = data["hidden_size"]
-output_size = data["output_size"]
-all_words = data['all_words']
-tags = data['tags']
-model_state = data["model_state"]
+def reload_model(force=False):
+    """
+    Load the model file again if it changed on disk (or force) and swap
+    it in. Returns True when a new model was swapped in.
+    """
+    global chat_model
+    if chat_model is None:
+        return False  # nothing loaded yet, init() reads the current file
+    with _reload_lock:
+        try:
+            signature = file_signature(model_file())
+        except OSError:
+            return False
+        if not force and signature == chat_model.signature:
+            return False
+        chat_model = load_chat_model()
+    return True
 
-model = NeuralNet(input_size, hidden_size, output_size).to(device)
-model.load_state_dict(model_state)
-model.eval()
+def maybe_reload_model():
+    """
+    Check for a new model file at most every RELOAD_INTERVAL seconds.
+    Failed reloads keep the current model serving.
+    """
+    global _last_reload_check
+    now = time.monotonic()
+    if RELOAD_INTERVAL <= 0 or now - _last_reload_check < RELOAD_INTERVAL:
+        return
+    _last_reload_check = now
+    if _reload_lock.locked():
+        return  # another request is already reloading
+    try:
+        reload_model()
+    except Exception as e:
+        print(f"Model reload failed, keeping the current model: {e}")
 
 bot_name = "Sam"
 
-def get_response(msg):
-    # FIRST: Check for direct patterns that don't need NLU
-    if is_variable_assignment(msg):
-        return handle_math_calculation(msg)
-    
-    if is_pdf_extraction(msg):
-        return handle_pdf_extraction(msg)
-    
-    if is_pdf_math_processing(msg):
-        return handle_pdf_math_processing(msg)
-    
-    if is_calculation_request(msg):
-        return handle_math_calculation(msg)
-    
-    # THEN: Use NLU for general conversation
-    sentence = tokenize(msg)
-    X = bag_of_words(sentence, all_words)
-    X = X.reshape(1, X.shape[0])
-    X = torch.from_numpy(X).to(device)
+# Answer verbatim training patterns ("Hi", "Thanks") without tokenizing
+# or running the model. CHAT_EXACT_MATCH=0 turns the fast path off.
+EXACT_MATCH_ENABLED = os.environ.get("CHAT_EXACT_MATCH", "1") != "0"
+exact_match_stats = {"hits": 0, "messages": 0}
+_exact_match_stats_lock = threading.Lock()
 
-    output = model(X)
-    _, predicted = torch.max(output, dim=1)
+def count_exact_match(key, count=1):
+    with _exact_match_stats_lock:
+        exact_match_stats[key] += count
 
-    tag = tags[predicted.item()]
+def normalize_pattern(text):
+    """lowercase, drop punctuation and collapse whitespace"""
+    return ' '.join(re.sub(r"[^\w\s]", '', text.lower()).split())
 
-    probs = torch.softmax(output, dim=1)
-    prob = probs[0][predicted.item()]
-    
+def build_exact_match_table(tags, intents):
+    """
+    Map every normalized training pattern to the index of its tag.
+    Patterns shared by several tags are left to the model.
+    """
+    tag_index = {tag: idx for idx, tag in enumerate(tags)}
+    table = {}
+    ambiguous = set()
+    for intent in intents['intents']:
+        if intent['tag'] not in tag_index:
+            continue
+        for pattern in intent['patterns']:
+            key = normalize_pattern(pattern)
+            if not key:
+                continue
+            if table.get(key, tag_index[intent['tag']]) != tag_index[intent['tag']]:
+                ambiguous.add(key)
+            table[key] = tag_index[intent['tag']]
+    for key in ambiguous:
+        del table[key]
+    return table
+
+def exact_match_share():
+    """share of answered messages served by the exact-match fast path"""
+    with _exact_match_stats_lock:
+        if not exact_match_stats["messages"]:
+            return 0.0
+        return exact_match_stats["hits"] / exact_match_stats["messages"]
+
+def get_response(msg, session=None):
+    return get_responses([msg], session)[0]
+
+def get_responses(messages, session=None):
+    """
+    Answer a list of messages at once.
+    Keyword routed messages and known training patterns are handled
+    directly, everything that falls through to NLU is encoded into one
+    bag of words matrix and classified with a single forward pass.
+    Answers keep the order of the messages. session (a user or
+    conversation id) keeps the processed PDFs of one user apart from
+    another's.
+    """
+    with session_scope(session):
+        return answer_messages(messages)
+
+def answer_messages(messages):
+    """get_responses inside the session scope"""
+    maybe_reload_model()
+    current = None
+
+    responses = [None] * len(messages)
+    nlu_positions = []
+    nlu_sentences = []
+
+    count_exact_match("messages", len(messages))
+
+    for position, msg in enumerate(messages):
+        routed = route_message(msg)
+        if routed is not None:
+            responses[position] = routed
+            continue
+        if current is None:
+            current = get_chat_model()
+        if EXACT_MATCH_ENABLED:
+            predicted = current.exact_match_table.get(normalize_pattern(msg))
+            if predicted is not None:
+                count_exact_match("hits")
+                responses[position] = respond_to_prediction(current, msg, predicted, 1.0)
+                continue
+        # Use NLU for general conversation
+        nlu_positions.append(position)
+        nlu_sentences.append(tokenize(msg))
+
+    if nlu_sentences:
+        prob, predicted = predict(current, current.bag_encoder.encode_batch(nlu_sentences))
+
+        for row, position in enumerate(nlu_positions):
+            responses[position] = respond_to_prediction(current, messages[position], predicted[row], prob[row])
+
+    return responses
+
+def predict(current, bags):
+    """
+    Classify a SparseBagMatrix of bag of words rows with a ChatModel,
+    returns the probability and the index of the predicted tag for every row
+    """
+    model = current.model
+    if torch is not None:
+        # int8 dynamic quantization picks the activation scale per call, so a
+        # quantized model sees one message at a time to keep answers
+        # independent of what else is in the batch
+        batches = ([bags.select_rows([row]) for row in range(len(bags))]
+                   if current.quantized else [bags])
+        outputs = []
+        with torch.no_grad():
+            for batch in batches:
+                if current.model_type == "sparse":
+                    outputs.append(model(*batch.to_bag_inputs(device)))
+                else:
+                    outputs.append(model(torch.from_numpy(batch.to_dense()).to(device)))
+        probs = torch.softmax(torch.cat(outputs), dim=1).cpu().numpy()
+    else:
+        probs = softmax(model.forward_sparse(bags))
+    predicted = probs.argmax(axis=1)
+    return probs[np.arange(len(predicted)), predicted].tolist(), predicted.tolist()
+
+def route_message(msg):
+    """Check for direct patterns that don't need NLU, None if nothing matches"""
+    return router.dispatch(msg)
+
+def respond_to_prediction(current, msg, predicted, prob):
+    """Build the answer for the index of a predicted intent tag"""
     # Lowered threshold for better recognition
-    if prob.item() > 0.5:  # Changed from 0.75 to 0.5
-        for intent in intents['intents']:
-            if tag == intent["tag"]:
-                # Special handling for different types of requests
-                if tag == "pdf_extract":
-                    return handle_pdf_extraction(msg)
-                elif tag == "pdf_math":
-                    return handle_pdf_math_processing(msg)
-                elif tag == "math_calculate":
-                    return handle_math_calculation(msg)
-                return random.choice(intent['responses'])
+    if prob > 0.5:  # Changed from 0.75 to 0.5
+        answer = current.tag_table[predicted]
+        if callable(answer):
+            # Special handling for different types of requests
+            return answer(msg)
+        if answer is not None:
+            return random.choice(answer)
     
     return "I do not understand..."
 
+def build_tag_table(tags, intents, handlers):
+    """
+    Precompute the answer for every model output index: a handler for
+    special tags, the intent's responses otherwise, None for tags missing
+    from intents.json. Warns when data.pth and intents.json disagree.
+    """
+    intents_by_tag = {intent["tag"]: intent for intent in intents['intents']}
+    
+    missing = [tag for tag in tags if tag not in intents_by_tag]
+    untrained = [tag for tag in intents_by_tag if tag not in set(tags)]
+    if missing:
+        print(f"Warning: trained tags {missing} are not in intents.json")
+    if untrained:
+        print(f"Warning: intents {untrained} are not in the trained model, run train.py again")
+    
+    table = []
+    for tag in tags:
+        if tag not in intents_by_tag:
+            table.append(None)
+        elif tag in handlers:
+            table.append(handlers[tag])
+        else:
+            table.append(intents_by_tag[tag]['responses'])
+    return table
+
+VARIABLE_ASSIGNMENT_PATTERN = r'\w+\s*=\s*\d+(?:\.\d+)?'
+PDF_EXTRACTION_KEYWORDS = ['extract pdf', 'read pdf', 'pdf extract', 'get text from pdf']
+PDF_MATH_KEYWORDS = ['process pdf with math', 'pdf math', 'analyze math pdf']
+# "evaluate <formula> with name=value", not "evaluate this with care"
+FORMULA_EVALUATION_PATTERN = r'\bevaluate\s+.+?\s+with\s+\w+\s*='
+CALCULATION_KEYWORDS = ['calculate', 'compute', 'solve', 'what is', 'how much is']
+
 def is_variable_assignment(message):
     """Check if message contains variable assignments like 'length=10, width=5'"""
-    pattern = r'\w+\s*=\s*\d+(?:\.\d+)?'
-    return bool(re.search(pattern, message.lower()))
+    return bool(re.search(VARIABLE_ASSIGNMENT_PATTERN, message.lower()))
 
 def is_pdf_extraction(message):
     """Check if message is requesting PDF extraction"""
-    keywords = ['extract pdf', 'read pdf', 'pdf extract', 'get text from pdf']
-    return any(keyword in message.lower() for keyword in keywords)
+    return any(keyword in message.lower() for keyword in PDF_EXTRACTION_KEYWORDS)
 
 def is_pdf_math_processing(message):
     """Check if message is requesting PDF math processing"""
-    keywords = ['process pdf with math', 'pdf math', 'analyze math pdf']
-    return any(keyword in message.lower() for keyword in keywords)
+    return any(keyword in message.lower() for keyword in PDF_MATH_KEYWORDS)
 
 def is_calculation_request(message):
     """Check if message is requesting calculation"""
-    keywords = ['calculate', 'compute', 'solve', 'what is', 'how much is']
-    return any(keyword in message.lower() for keyword in keywords)
+    return any(keyword in message.lower() for keyword in CALCULATION_KEYWORDS)
 
 def handle_pdf_extraction(message):
     """
@@ -143,12 +415,16 @@ def handle_math_calculation(message):
                 else:
                     return "❌ Unsupported operation. Use +, -, *, /, or **"
                 
+                try:
+                    check_result(result)
+                except ValueError as e:
+                    return f"❌ Error evaluating expression: {e}"
                 return f"🧮 **Calculation Result:** {num1} {operator_sym} {num2} = {result:.4f}"
             
             elif math_input['type'] == 'complex_calculation':
                 expression = math_input['expression']
                 try:
-                    result = MathExpressionEvaluator.eval_expression(expression)
+                    result = MathExpressionEvaluator.eval_expression(expression, timeout=EVALUATION_TIMEOUT)
                     if isinstance(result, (int, float)):
                         return f"🧮 **Complex Calculation:** {expression} = {result:.4f}"
                     else:
@@ -156,51 +432,20 @@ def handle_math_calculation(message):
                 except Exception as e:
                     return f"❌ Error evaluating expression: {str(e)}"
             
+            elif math_input['type'] == 'range_evaluation':
+                return handle_range_evaluation(math_input, message)
+            
             elif math_input['type'] == 'variable_assignment':
                 variables = math_input['variables']
                 
-                # Enhanced geometric calculations
-                if 'length' in variables and 'width' in variables:
-                    area = variables['length'] * variables['width']
-                    perimeter = 2 * (variables['length'] + variables['width'])
-                    return (f"📐 **Rectangle Calculations:**\n"
-                           f"• Length = {variables['length']}\n"
-                           f"• Width = {variables['width']}\n"
-                           f"• Area = {area:.4f}\n"
-                           f"• Perimeter = {perimeter:.4f}")
-                
-                elif 'side' in variables:
-                    area = variables['side'] ** 2
-                    perimeter = 4 * variables['side']
-                    return (f"🔲 **Square Calculations:**\n"
-                           f"• Side = {variables['side']}\n"
-                           f"• Area = {area:.4f}\n"
-                           f"• Perimeter = {perimeter:.4f}")
+                shape = find_shape(variables, message)
+                if shape is not None:
+                    return shape.format(variables)
                 
-                elif 'radius' in variables:
-                    import math
-                    area = math.pi * (variables['radius'] ** 2)
-                    circumference = 2 * math.pi * variables['radius']
-                    return (f"⭕ **Circle Calculations:**\n"
-                           f"• Radius = {variables['radius']}\n"
-                           f"• Area = π × {variables['radius']}² = {area:.4f}\n"
-                           f"• Circumference = 2π × {variables['radius']} = {circumference:.4f}")
-                
-                elif 'base' in variables and 'height' in variables:
-                    area = 0.5 * variables['base'] * variables['height']
-                    return (f"🔺 **Triangle Area:**\n"
-                           f"• Base = {variables['base']}\n"
-                           f"• Height = {variables['height']}\n"
-                           f"• Area = ½ × {variables['base']} × {variables['height']} = {area:.4f}")
-                
-                else:
-                    response = f"📊 **Variables received:** {variables}\n\n"
-                    response += "💡 **Available calculations:**\n"
-                    response += "• Rectangle: length + width\n"
-                    response += "• Square: side\n"
-                    response += "• Circle: radius\n"
-                    response += "• Triangle: base + height\n"
-                    return response
+                response = f"📊 **Variables received:** {variables}\n\n"
+                response += "💡 **Available calculations:**\n"
+                response += "\n".join(describe_shapes()) + "\n"
+                return response
         else:
             return ("🔢 **Math Calculator Ready!** Try:\n\n"
                    "**Simple calculations:**\n"
@@ -210,16 +455,105 @@ def handle_math_calculation(message):
                    "• `calculate (2 + 3) * 4`\n"
                    "• `calculate 2**3` (power)\n"
                    "• `calculate sqrt(16)` (square root)\n"
+                   "• `calculate 2 * pi * sin(0.5)` (sin, cos, log, exp, abs, ...)\n"
                    "• `calculate (5 + 3)**2`\n\n"
                    "**Geometry:**\n"
                    "• `length=10, width=5`\n"
                    "• `side=4`\n"
                    "• `radius=3`\n"
-                   "• `base=6, height=4`")
+                   "• `base=6, height=4`\n"
+                   "• `sphere radius=2`, `radius=1, height=3` (cylinder)\n\n"
+                   "**Ranges:**\n"
+                   "• `radius=1..100 step 0.5`\n"
+                   "• `calculate x**2 + 1 for x=0..10`")
             
     except Exception as e:
         return f"❌ Math calculation error: {str(e)}"
 
+def handle_range_evaluation(math_input, message=""):
+    """
+    Evaluate an expression or the formulas of a shape over ranges of
+    values (radius=1..100 step 0.5) in one vectorized pass, answer with
+    a table and a summary per result
+    """
+    try:
+        bindings = {**math_input['variables'], **build_grid(math_input['ranges'])}
+    except ValueError as e:
+        return f"❌ {str(e)}"
+    
+    if math_input['expression']:
+        title = f"📊 **{math_input['expression']}**"
+        formulas = [("Result", math_input['expression'])]
+    else:
+        shape = find_shape(bindings, message)
+        if shape is None:
+            return ("❌ No formula for these ranges. Use `calculate <expression> for x=1..10` "
+                    "or a shape:\n" + "\n".join(describe_shapes()))
+        title = f"📊 **{shape.name.capitalize()} Calculations**"
+        formulas = [(result.replace('_', ' ').title(), formula)
+                    for result, formula in shape.formulas.items()]
+    
+    columns = [(name.capitalize(), bindings[name]) for name in math_input['ranges']]
+    for label, formula in formulas:
+        values = MathExpressionEvaluator.eval_vectorized(formula, bindings, timeout=EVALUATION_TIMEOUT)
+        columns.append((label, values))
+    
+    count = len(columns[0][1])
+    response = f"{title} for {count} values:\n"
+    for name, (start, stop, step) in math_input['ranges'].items():
+        response += f"• {name.capitalize()} = {start:g} .. {stop:g} (step {step:g})\n"
+    response += "\n" + format_value_table(columns) + "\n\n"
+    for label, values in columns[len(math_input['ranges']):]:
+        summary = summarize_values(values)
+        if "min" in summary:
+            response += f"• {label}: min {summary['min']:.4f}, max {summary['max']:.4f}, mean {summary['mean']:.4f}"
+        else:
+            response += f"• {label}: no finite values"
+        if summary["invalid"]:
+            response += f" ({summary['invalid']} undefined)"
+        response += "\n"
+    return response.rstrip()
+
+def handle_formula_evaluation(message):
+    """
+    Evaluate a formula stored from the last PDF processed in this session
+    ("evaluate luas with panjang=10, lebar=5"), or an expression with the given
+    values ("evaluate x**2 + y with x=3, y=1")
+    """
+    match = re.search(r'\bevaluate\s+(.+?)\s+with\s+(\w+\s*=.*)$', message, re.IGNORECASE | re.DOTALL)
+    if not match:
+        return handle_math_calculation(message)
+    name = match.group(1).strip()
+    values = {var: float(val) for var, val in
+              re.findall(r'(\w+)\s*=\s*(-?\d+(?:\.\d+)?(?:e[+-]?\d+)?)(?![\w.])',
+                         match.group(2), re.IGNORECASE)}
+    
+    store = find_store()
+    if store is not None and store.get(name) is not None:
+        try:
+            formula, value = store.evaluate(name, values, timeout=EVALUATION_TIMEOUT)
+        except (ValueError, TimeoutError) as e:
+            return f"❌ {str(e)}"
+        response = f"🧮 **{formula.name}** = {formula.expression}\n"
+        for var, val in values.items():
+            response += f"• {var} = {val}\n"
+        return response + f"• Result = {value:.4f}"
+    
+    if re.fullmatch(r'[\w\s-]+', name) and not re.fullmatch(r'[\d\s.]+', name):
+        if store is None:
+            return (f"❌ No formula named '{name}'. Process a PDF first: "
+                   f"`process PDF with math file.pdf`")
+        available = ", ".join(formula.name for formula in store.formulas[:10])
+        response = f"❌ No formula named '{name}' in {store.source}. Available: {available or 'none'}"
+        if store.skipped:
+            response += f" ({len(store.skipped)} formulas in the document could not be read)"
+        return response
+    
+    result = MathExpressionEvaluator.eval_expression(name, formula_bindings(values), timeout=EVALUATION_TIMEOUT)
+    if isinstance(result, (int, float)):
+        return f"🧮 **Complex Calculation:** {name} = {result:.4f}"
+    return f"❌ {result}"
+
 def handle_pdf_math_processing(message):
     """
     Enhanced PDF math processing with complex formula support
@@ -249,9 +583,15 @@ def handle_pdf_math_processing(message):
                     else:
                         response += f"{i}. {formula['formula']} (Simple)\n"
                 
+                store = FormulaStore(pdf_path).add_extracted(result['formulas'])
+                remember_store(pdf_path, store)
+                
                 if result['formulas']:
                     response += f"\n💡 **You can now calculate using these formulas!**\n"
                     response += f"Examples:\n"
+                    for formula in store.formulas[:2]:
+                        assignments = ", ".join(f"{name}=2" for name in sorted(formula.variables))
+                        response += f"• `evaluate {formula.name} with {assignments}`\n"
                     response += f"• `calculate (2 + 3) * 4`\n"
                     response += f"• `calculate sqrt(16)`\n"
                     response += f"• `length=10, width=5`\n"
@@ -270,3 +610,19 @@ def handle_pdf_math_processing(message):
                "• Square roots: sqrt(x)\n"
                "• Complex expressions")
 
+# Direct patterns that don't need NLU, in priority order.
+# Register more with router.add_route(); get_response picks them up.
+router = MessageRouter()
+router.add_route("formula_evaluation", handle_formula_evaluation, pattern=FORMULA_EVALUATION_PATTERN)
+router.add_route("variable_assignment", handle_math_calculation, pattern=VARIABLE_ASSIGNMENT_PATTERN)
+router.add_route("pdf_extraction", handle_pdf_extraction, keywords=PDF_EXTRACTION_KEYWORDS)
+router.add_route("pdf_math_processing", handle_pdf_math_processing, keywords=PDF_MATH_KEYWORDS)
+router.add_route("calculation", handle_math_calculation, keywords=CALCULATION_KEYWORDS)
+router.compile()
+
+# Intents answered by a handler instead of a canned response
+TAG_HANDLERS = {
+    "pdf_extract": handle_pdf_extraction,
+    "pdf_math": handle_pdf_math_processing,
+    "math_calculate": handle_math_calculation,
+}
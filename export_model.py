@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Export data.pth for CPU serving: int8 dynamic quantization of the
+nn.Linear layers and/or a frozen TorchScript module.
+The export is only written when its predictions on the training
+patterns match the eager float32 model, and the latency, size and
+memory (peak RSS of a worker serving it) difference is reported. chat.py serves it with CHAT_ENGINE=torchscript.
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from model import build_model
+
+FILE = "data.pth"
+SERVING_FILE = "data_serving.pt"
+META_FILE = "meta.json"
+
+# a fresh process per model so RSS is per worker, like bench_inference.py
+RSS_WORKER_CODE = r'''
+import json, resource, sys
+import torch
+from export_model import load_eager_model, load_serving_model
+kind, path, model_type, input_size = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+def current_rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+before = current_rss()
+model, _ = load_eager_model(path) if kind == "eager" else load_serving_model(path)
+if model_type == "sparse":
+    inputs = (torch.arange(min(5, input_size)), torch.tensor([0]))
+else:
+    inputs = (torch.zeros(1, input_size),)
+with torch.no_grad():
+    for _ in range(100):
+        model(*inputs)
+model_rss = current_rss() - before
+# ru_maxrss is in KiB on Linux
+print(json.dumps({"rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  "model_rss_mb": model_rss}))
+'''
+
+
+def load_eager_model(pth_file=FILE):
+    data = torch.load(pth_file)
+    model_type = data.get("model_type", "dense")
+    model = build_model(model_type, data["input_size"], data["hidden_size"], data["output_size"])
+    model.load_state_dict(data["model_state"])
+    model.eval()
+    return model, data
+
+
+def convert_model(model, quantize=True, freeze=True):
+    """int8 dynamic quantization of the linear layers, then TorchScript (frozen)"""
+    with warnings.catch_warnings():
+        # eager mode quantization and TorchScript are deprecated in favour
+        # of torchao / torch.compile
+        warnings.simplefilter("ignore")
+        if quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        scripted = torch.jit.script(model)
+        if freeze:
+            scripted = torch.jit.freeze(scripted)
+    return scripted
+
+
+def model_inputs(bags, model_type):
+    if model_type == "sparse":
+        return bags.to_bag_inputs()
+    return (torch.from_numpy(bags.to_dense()),)
+
+
+def serialized_size(model):
+    buffer = io.BytesIO()
+    if isinstance(model, torch.jit.ScriptModule):
+        torch.jit.save(model, buffer)
+    else:
+        torch.save(model.state_dict(), buffer)
+    return len(buffer.getvalue())
+
+
+def worker_rss(kind, path, model_type, input_size):
+    """
+    peak RSS in MB of a fresh process serving the eager or exported model,
+    and how much of it loading and running the model added after torch
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", RSS_WORKER_CODE, kind, os.path.abspath(path), model_type, str(input_size)],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    return result["rss_mb"], result["model_rss_mb"]
+
+
+def latency_per_message(model, bags, model_type, repeats=20):
+    """mean time of one single-message forward pass over all rows"""
+    messages = [model_inputs(bags.select_rows([row]), model_type) for row in range(len(bags))]
+    with torch.no_grad():
+        for inputs in messages:
+            model(*inputs)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for inputs in messages:
+                model(*inputs)
+    return (time.perf_counter() - start) / (repeats * len(messages))
+
+
+def training_bags(data, intents_file='intents.json'):
+    """bag of words rows of the training patterns for the parity check"""
+    from nltk_utils import BagOfWordsEncoder
+    from train import load_corpus_cache, load_intents, prepare_corpus
+
+    _, _, xy = prepare_corpus(load_intents(intents_file), load_corpus_cache())
+    tag_to_id = {tag: idx for idx, tag in enumerate(data["tags"])}
+    bags = BagOfWordsEncoder(data["all_words"]).encode_batch(words for (words, tag) in xy)
+    labels = np.array([tag_to_id.get(tag, -1) for (words, tag) in xy])
+    return bags, labels
+
+
+def export_serving_model(pth_file=FILE, output_file=SERVING_FILE, quantize=True,
+                         freeze=True, min_agreement=1.0, intents_file='intents.json',
+                         verbose=True):
+    """
+    Convert, check parity on the training patterns, save with the
+    vocabulary and tags embedded. Returns the report dict; raises
+    ValueError (and writes nothing) when parity is below min_agreement.
+    """
+    eager, data = load_eager_model(pth_file)
+    model_type = data.get("model_type", "dense")
+    exported = convert_model(eager, quantize=quantize, freeze=freeze)
+
+    bags, labels = training_bags(data, intents_file)
+    with torch.no_grad():
+        eager_output = eager(*model_inputs(bags, model_type))
+        exported_output = exported(*model_inputs(bags, model_type))
+    eager_predicted = eager_output.argmax(dim=1).numpy()
+    exported_predicted = exported_output.argmax(dim=1).numpy()
+
+    report = {
+        "patterns": len(labels),
+        "agreement": float((eager_predicted == exported_predicted).mean()),
+        "eager_accuracy": float((eager_predicted == labels).mean()),
+        "exported_accuracy": float((exported_predicted == labels).mean()),
+        "max_abs_diff": float((eager_output - exported_output).abs().max()),
+        "eager_latency": latency_per_message(eager, bags, model_type),
+        "exported_latency": latency_per_message(exported, bags, model_type),
+        "eager_size": serialized_size(eager),
+        "exported_size": serialized_size(exported),
+    }
+
+    meta = {
+        "model_type": model_type,
+        "input_size": data["input_size"],
+        "hidden_size": data["hidden_size"],
+        "output_size": data["output_size"],
+        "all_words": data["all_words"],
+        "tags": data["tags"],
+        "quantized": quantize,
+    }
+    # written next to output_file and renamed over it once parity holds,
+    # the RSS worker loads it from there
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_file)),
+                                    prefix=".tmp-", suffix=".pt")
+    os.close(fd)
+    try:
+        torch.jit.save(exported, tmp_file, _extra_files={META_FILE: json.dumps(meta)})
+        report["eager_rss_mb"], report["eager_model_rss_mb"] = worker_rss(
+            "eager", pth_file, model_type, data["input_size"])
+        report["exported_rss_mb"], report["exported_model_rss_mb"] = worker_rss(
+            "exported", tmp_file, model_type, data["input_size"])
+
+        if verbose:
+            print(f"Parity on {report['patterns']} training patterns: "
+                  f"{report['agreement']:.2%} same predictions, "
+                  f"accuracy {report['eager_accuracy']:.2%} -> {report['exported_accuracy']:.2%}, "
+                  f"max logit diff {report['max_abs_diff']:.4f}")
+            print(f"Latency per message: {report['eager_latency'] * 1e6:.1f}µs (eager float32) -> "
+                  f"{report['exported_latency'] * 1e6:.1f}µs")
+            print(f"Model size: {report['eager_size'] / 1024:.1f}KB -> "
+                  f"{report['exported_size'] / 1024:.1f}KB")
+            print(f"Peak RSS per worker: {report['eager_rss_mb']:.1f}MB -> "
+                  f"{report['exported_rss_mb']:.1f}MB, of that the model "
+                  f"{report['eager_model_rss_mb']:.1f}MB -> {report['exported_model_rss_mb']:.1f}MB")
+
+        if report["agreement"] < min_agreement:
+            raise ValueError(f"Exported model agrees on {report['agreement']:.2%} of the training "
+                             f"patterns, below the required {min_agreement:.2%}")
+        # mkstemp creates the file private to the owner
+        os.chmod(tmp_file, 0o644)
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+    if verbose:
+        print(f'export complete. file saved to {output_file}')
+    return report
+
+
+def load_serving_model(serving_file=SERVING_FILE):
+    """load an exported model, returns it with its metadata dict"""
+    extra_files = {META_FILE: ""}
+    model = torch.jit.load(serving_file, map_location='cpu', _extra_files=extra_files)
+    model.eval()
+    return model, json.loads(extra_files[META_FILE])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the intent model for CPU serving")
+    parser.add_argument("--input", default=FILE)
+    parser.add_argument("--output", default=SERVING_FILE)
+    parser.add_argument("--no-quantize", action="store_true", help="keep float32 weights")
+    parser.add_argument("--no-freeze", action="store_true", help="don't freeze the TorchScript module")
+    parser.add_argument("--min-agreement", type=float, default=1.0,
+                        help="required share of training patterns with unchanged predictions")
+    args = parser.parse_args()
+
+    export_serving_model(args.input, args.output,
+                         quantize=not args.no_quantize,
+                         freeze=not args.no_freeze,
+                         min_agreement=args.min_agreement)
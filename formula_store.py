@@ -0,0 +1,143 @@
+"""
+Formulas extracted from a PDF, compiled once and kept per document (or
+per session), so "evaluate luas with panjang=10, lebar=5" runs the
+stored evaluator without extracting or parsing anything again.
+"""
+
+import contextlib
+import os
+import re
+import threading
+
+from cache_utils import LRUCache
+from glossary import get_glossary
+from math_utils import (
+    MathExpressionEvaluator,
+    check_result,
+    evaluation_deadline,
+    formula_bindings,
+    formula_expression
+)
+
+
+def normalize_name(name):
+    """'Persegi Panjang' -> 'persegi_panjang'"""
+    return '_'.join(re.findall(r'\w+', name.lower()))
+
+
+class StoredFormula:
+    def __init__(self, name, compiled, source=None):
+        self.name = name
+        self.compiled = compiled
+        self.expression = compiled.text
+        self.variables = compiled.names
+        self.source = source
+
+
+class FormulaStore:
+    """
+    Compiled formulas of one document or session, looked up by result
+    name, by the text left of '=' in the document ("Luas", "Segitiga")
+    or by its English translation.
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+        self.formulas = []
+        self.by_name = {}
+        # (formula dict, reason) of extracted formulas that don't compile
+        self.skipped = []
+
+    def __len__(self):
+        return len(self.formulas)
+
+    def add(self, name, expression, aliases=(), source=None):
+        """compile and store a formula, raises SyntaxError / ValueError"""
+        formula = StoredFormula(name, MathExpressionEvaluator.compile(expression), source)
+        self.formulas.append(formula)
+        for alias in (name, *aliases):
+            # the first formula with a name keeps it
+            self.by_name.setdefault(normalize_name(alias), formula)
+        return formula
+
+    def add_extracted(self, formula_dicts):
+        """store the formulas of extract_math_formulas, returns the store"""
+        for formula_dict in formula_dicts:
+            label = formula_dict.get('original_line', '').split('=', 1)[0]
+            aliases = [label, translate_name(label), formula_dict.get('type', '')]
+            try:
+                self.add(formula_dict['result'], formula_expression(formula_dict),
+                         aliases=[alias for alias in aliases if alias], source=formula_dict)
+            except (SyntaxError, ValueError) as e:
+                self.skipped.append((formula_dict, str(e)))
+        return self
+
+    def get(self, name):
+        """the formula stored under a name or alias, None if there is none"""
+        formula = self.by_name.get(normalize_name(name))
+        if formula is None:
+            formula = self.by_name.get(normalize_name(translate_name(name)))
+        return formula
+
+    def evaluate(self, name, values, timeout=None):
+        """
+        Evaluate a stored formula with values by variable name, returns
+        the formula and its value. Raises KeyError for unknown formulas,
+        ValueError for missing values or failed evaluations (TimeoutError
+        past the timeout).
+        """
+        formula = self.get(name)
+        if formula is None:
+            raise KeyError(name)
+        bindings = formula_bindings(values)
+        missing = sorted(variable for variable in formula.variables if variable not in bindings)
+        if missing:
+            raise ValueError(f"Missing values for: {', '.join(missing)}")
+        try:
+            with evaluation_deadline(timeout):
+                return formula, check_result(formula.compiled(bindings))
+        except TimeoutError:
+            raise
+        except Exception as e:
+            # exp(1000), sqrt(x, w), ... one error type like eval_expression
+            raise ValueError(f"Error evaluating expression: {str(e)}") from e
+
+
+def translate_name(name):
+    return get_glossary('analysis').translate(name.lower())
+
+
+# FormulaStore of each processed document by absolute path, and per
+# session the document that session processed last, which "evaluate ..."
+# uses by default. One user's document never answers another's query.
+document_stores = LRUCache(maxsize=32)
+session_stores = LRUCache(maxsize=1024)
+
+_session = threading.local()
+
+
+@contextlib.contextmanager
+def session_scope(session):
+    """messages handled in this block belong to session (None: the default session)"""
+    previous = getattr(_session, "id", None)
+    _session.id = session
+    try:
+        yield
+    finally:
+        _session.id = previous
+
+
+def current_session():
+    return getattr(_session, "id", None)
+
+
+def remember_store(path, store):
+    document_stores.put(os.path.abspath(path), store)
+    session_stores.put(current_session(), store)
+
+
+def find_store(path=None):
+    """the store of a processed document, or the current session's one without a path"""
+    if path is None:
+        return session_stores.get(current_session())
+    return document_stores.get(os.path.abspath(path))
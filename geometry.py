@@ -0,0 +1,183 @@
+"""
+Geometry shapes as data: the variables a shape needs, its formulas and
+the answer template. Shapes are looked up by the set of variable names
+in the message, adding one is adding an entry to SHAPE_DEFINITIONS (or
+calling register_shape).
+"""
+
+import re
+
+from math_utils import MathExpressionEvaluator
+
+SHAPE_DEFINITIONS = [
+    {
+        "name": "rectangle",
+        "variables": ["length", "width"],
+        "formulas": {"area": "length * width",
+                     "perimeter": "2 * (length + width)"},
+        "template": ("📐 **Rectangle Calculations:**\n"
+                     "• Length = {length}\n"
+                     "• Width = {width}\n"
+                     "• Area = {area:.4f}\n"
+                     "• Perimeter = {perimeter:.4f}"),
+    },
+    {
+        "name": "square",
+        "variables": ["side"],
+        "formulas": {"area": "side ** 2",
+                     "perimeter": "4 * side"},
+        "template": ("🔲 **Square Calculations:**\n"
+                     "• Side = {side}\n"
+                     "• Area = {area:.4f}\n"
+                     "• Perimeter = {perimeter:.4f}"),
+    },
+    {
+        "name": "circle",
+        "variables": ["radius"],
+        "formulas": {"area": "pi * radius ** 2",
+                     "circumference": "2 * pi * radius"},
+        "template": ("⭕ **Circle Calculations:**\n"
+                     "• Radius = {radius}\n"
+                     "• Area = π × {radius}² = {area:.4f}\n"
+                     "• Circumference = 2π × {radius} = {circumference:.4f}"),
+    },
+    {
+        "name": "triangle",
+        "variables": ["base", "height"],
+        "formulas": {"area": "0.5 * base * height"},
+        "template": ("🔺 **Triangle Area:**\n"
+                     "• Base = {base}\n"
+                     "• Height = {height}\n"
+                     "• Area = ½ × {base} × {height} = {area:.4f}"),
+    },
+    {
+        "name": "trapezoid",
+        "variables": ["base1", "base2", "height"],
+        "formulas": {"area": "0.5 * (base1 + base2) * height"},
+        "template": ("🔷 **Trapezoid Area:**\n"
+                     "• Base 1 = {base1}\n"
+                     "• Base 2 = {base2}\n"
+                     "• Height = {height}\n"
+                     "• Area = ½ × ({base1} + {base2}) × {height} = {area:.4f}"),
+    },
+    {
+        "name": "cylinder",
+        "variables": ["radius", "height"],
+        "formulas": {"volume": "pi * radius ** 2 * height",
+                     "surface_area": "2 * pi * radius * (radius + height)"},
+        "template": ("🛢️ **Cylinder Calculations:**\n"
+                     "• Radius = {radius}\n"
+                     "• Height = {height}\n"
+                     "• Volume = π × {radius}² × {height} = {volume:.4f}\n"
+                     "• Surface Area = 2π × {radius} × ({radius} + {height}) = {surface_area:.4f}"),
+    },
+    {
+        "name": "cone",
+        "variables": ["radius", "height"],
+        "formulas": {"volume": "pi * radius ** 2 * height / 3",
+                     "surface_area": "pi * radius * (radius + sqrt(radius ** 2 + height ** 2))"},
+        "template": ("🍦 **Cone Calculations:**\n"
+                     "• Radius = {radius}\n"
+                     "• Height = {height}\n"
+                     "• Volume = ⅓ × π × {radius}² × {height} = {volume:.4f}\n"
+                     "• Surface Area = {surface_area:.4f}"),
+    },
+    {
+        "name": "sphere",
+        "variables": ["radius"],
+        "formulas": {"volume": "4 / 3 * pi * radius ** 3",
+                     "surface_area": "4 * pi * radius ** 2"},
+        "template": ("🌐 **Sphere Calculations:**\n"
+                     "• Radius = {radius}\n"
+                     "• Volume = ⁴⁄₃ × π × {radius}³ = {volume:.4f}\n"
+                     "• Surface Area = 4π × {radius}² = {surface_area:.4f}"),
+    },
+    {
+        "name": "cube",
+        "variables": ["side"],
+        "formulas": {"volume": "side ** 3",
+                     "surface_area": "6 * side ** 2"},
+        "template": ("🧊 **Cube Calculations:**\n"
+                     "• Side = {side}\n"
+                     "• Volume = {side}³ = {volume:.4f}\n"
+                     "• Surface Area = 6 × {side}² = {surface_area:.4f}"),
+    },
+]
+
+
+class Shape:
+    """A shape definition with its formulas compiled once"""
+
+    def __init__(self, name, variables, formulas, template):
+        self.name = name
+        self.variables = tuple(variables)
+        self.key = frozenset(variables)
+        self.formulas = dict(formulas)
+        self.compiled = {result: MathExpressionEvaluator.compile(formula)
+                         for result, formula in self.formulas.items()}
+        self.template = template
+
+    def evaluate(self, variables):
+        """result name -> value, variables may be numbers or NumPy arrays"""
+        bindings = {name: variables[name] for name in self.variables}
+        return {result: compiled(bindings) for result, compiled in self.compiled.items()}
+
+    def format(self, variables):
+        values = {name: variables[name] for name in self.variables}
+        return self.template.format(**values, **self.evaluate(values))
+
+
+# frozenset of variable names -> shapes taking exactly those variables,
+# the first one registered is the default when the message doesn't name one
+SHAPES = {}
+SHAPES_BY_NAME = {}
+# registration order, for messages with extra variables
+SHAPE_ORDER = []
+
+
+def register_shape(name, variables, formulas, template):
+    shape = Shape(name, variables, formulas, template)
+    SHAPES.setdefault(shape.key, []).append(shape)
+    SHAPES_BY_NAME[name] = shape
+    SHAPE_ORDER.append(shape)
+    return shape
+
+
+def unregister_shape(name):
+    shape = SHAPES_BY_NAME.pop(name)
+    SHAPES[shape.key].remove(shape)
+    if not SHAPES[shape.key]:
+        del SHAPES[shape.key]
+    SHAPE_ORDER.remove(shape)
+
+
+def find_shape(variables, message=""):
+    """
+    The shape for a dict of variables, None if no shape fits.
+    A shape named in the message wins when all its variables are given,
+    then the shape taking exactly these variables. With extra variables
+    the first registered shape they cover is used, like the old if-chain.
+    """
+    given = variables.keys()
+    for word in re.findall(r'[a-z]+', message.lower()):
+        shape = SHAPES_BY_NAME.get(word)
+        if shape is not None and shape.key <= given:
+            return shape
+
+    candidates = SHAPES.get(frozenset(given))
+    if candidates:
+        return candidates[0]
+
+    for shape in SHAPE_ORDER:
+        if shape.key <= given:
+            return shape
+    return None
+
+
+def describe_shapes():
+    """one line per shape with the variables it needs"""
+    return [f"• {shape.name.capitalize()}: {' + '.join(shape.variables)}" for shape in SHAPE_ORDER]
+
+
+for definition in SHAPE_DEFINITIONS:
+    register_shape(**definition)
@@ -0,0 +1,85 @@
+"""
+Indonesian -> English glossary (glossary.json), every section compiled
+once into a single regex. The terms are laid out as a trie, so matching
+a line costs about the same with 15 terms or with thousands, and at each
+position the longest term wins (like the old per-term loops, which ran
+the longer terms first).
+"""
+
+import hashlib
+import json
+import os
+import re
+
+GLOSSARY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "glossary.json")
+
+
+def trie_pattern(terms):
+    """
+    Regex matching any of the terms, longest first:
+    ['persegi', 'persegi panjang', 'panjang'] -> 'p(?:anjang|ersegi(?:\\ panjang)?)'
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def pattern(node):
+        branches = [re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = f"(?:{'|'.join(branches)})"
+        # a term ends here, a longer one may go on
+        return group + "?" if "" in node else group
+
+    return pattern(trie)
+
+
+class Glossary:
+    """
+    Terms (lowercase) -> translation. translate() replaces every term in
+    one pass over the text, the text is matched as is so callers lower it.
+    """
+
+    def __init__(self, terms, whole_words=False):
+        self.terms = {term.lower(): translation for term, translation in terms.items() if term}
+        self.whole_words = whole_words
+        pattern = trie_pattern(self.terms)
+        if whole_words:
+            pattern = rf"\b(?:{pattern})\b"
+        self.pattern = re.compile(pattern) if self.terms else None
+        # changes whenever a term or the matching mode does
+        self.version = hashlib.sha256(json.dumps([self.terms, whole_words], sort_keys=True)
+                                      .encode("utf-8")).hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.terms)
+
+    def translate(self, text):
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(lambda match: self.terms[match.group(0)], text)
+
+
+def load_glossary(path=GLOSSARY_FILE):
+    """section name -> Glossary from a glossary file"""
+    with open(path, encoding="utf-8") as f:
+        sections = json.load(f)
+    return {name: Glossary(section["terms"], whole_words=section.get("whole_words", False))
+            for name, section in sections.items()}
+
+
+# compiled on first use by get_glossary()
+glossaries = None
+
+
+def get_glossary(section):
+    """the compiled Glossary of a section of glossary.json"""
+    global glossaries
+    if glossaries is None:
+        glossaries = load_glossary()
+    return glossaries[section]
@@ -1,11 +1,26 @@
-from googletrans import Translator
 import re
 import math
 import ast
+import contextlib
 import operator
+import threading
+import time
 
-# Initialize translator
-translator = Translator()
+from cache_utils import LRUCache
+from glossary import get_glossary
+from text_normalizer import FORMULA_LINE, TRANSLATED_LINE
+from translation_cache import get_translation_cache
+
+# googletrans is imported and the Translator created on first use
+translator = None
+
+def get_translator():
+    """the shared googletrans Translator, created on first call"""
+    global translator
+    if translator is None:
+        from googletrans import Translator
+        translator = Translator()
+    return translator
 
 def clean_pdf_extracted_text(text):
     """
@@ -44,35 +59,8 @@ def clean_single_line(line):
     """
     Clean individual line while preserving mathematical structure
     """
-    # Normalize spacing around operators
-    line = re.sub(r'\s*=\s*', ' = ', line)
-    line = re.sub(r'\s*\*\*\s*', '**', line)
-    line = re.sub(r'\s*\*\s*', ' * ', line)
-    line = re.sub(r'\s*/\s*', ' / ', line)
-    line = re.sub(r'\s*\+\s*', ' + ', line)
-    line = re.sub(r'\s*-\s*', ' - ', line)
-    
-    # Fix parentheses spacing
-    line = re.sub(r'\s*\(\s*', '(', line)
-    line = re.sub(r'\s*\)\s*', ')', line)
-    
-    # Handle mathematical symbols
-    line = re.sub(r'𝑥', 'x', line)
-    line = re.sub(r'√', 'sqrt', line)
-    
-    # Fix power notation specifically
-    line = re.sub(r'sisi\s*\*\*\s*2', 'sisi**2', line, flags=re.IGNORECASE)
-    line = re.sub(r'(\w+)\s*\*\*\s*2', r'\1**2', line)
-    
-    # Fix broken words
-    line = re.sub(r'Pers\s+egi', 'Persegi', line, flags=re.IGNORECASE)
-    line = re.sub(r'Segiti\s+ga', 'Segitiga', line, flags=re.IGNORECASE)
-    line = re.sub(r'Men\s+cari', 'Mencari', line, flags=re.IGNORECASE)
-    
-    # Remove excessive whitespace
-    line = re.sub(r'\s{2,}', ' ', line)
-    
-    return line.strip()
+    # Operator spacing, symbols and broken words in one pass
+    return FORMULA_LINE.normalize(line)
 
 def translate_indonesian_to_english(text):
     """
@@ -83,67 +71,51 @@ def translate_indonesian_to_english(text):
         cleaned_text = clean_pdf_extracted_text(text)
         
         # Translate line by line untuk mempertahankan struktur
-        lines = cleaned_text.split('\n')
-        translated_lines = []
-        
-        for line in lines:
-            if line.strip():
-                translated_line = translate_single_line(line)
-                translated_lines.append(translated_line)
-        
-        return '\n'.join(translated_lines)
+        lines = [line for line in cleaned_text.split('\n') if line.strip()]
+        return '\n'.join(translate_lines(lines))
         
     except Exception as e:
         print(f"Translation error: {e}")
         return clean_pdf_extracted_text(text)
 
+# bump when translate_single_line translates differently, cached
+# translations of older versions are then not used
+TRANSLATION_RULES_VERSION = 1
+
+def translator_version():
+    return f"glossary-{get_glossary('translation').version}-{TRANSLATION_RULES_VERSION}"
+
+def translate_lines(lines, backend=None):
+    """
+    Translations of lines in order, from the translation cache when the
+    same line was translated before (by this or another worker), the
+    rest in batches by the translation backend (CHAT_TRANSLATION_BACKEND)
+    """
+    # translation_backends imports this module
+    from translation_backends import get_translation_backend
+    backend = backend or get_translation_backend()
+    cache = get_translation_cache()
+    version = backend.version
+    translations = cache.get_many(lines, version)
+    missing = list(dict.fromkeys(line for line in lines if line not in translations))
+    if missing:
+        translated = dict(zip(missing, backend.translate(missing)))
+        cache.put_many({line: translation for line, translation in translated.items()
+                        if translation is not None}, version)
+        for line, translation in translated.items():
+            # lines the backend couldn't translate use the glossary, uncached
+            translations[line] = translation if translation is not None else translate_single_line(line)
+    return [translations[line] for line in lines]
+
 def translate_single_line(line):
     """
     Translate single line dengan preserving mathematical structure
     """
-    # Dictionary untuk terminologi matematika Indonesia-Inggris
-    math_terms = {
-        'persegi panjang': 'rectangle',
-        'persegi': 'square',
-        'segitiga': 'triangle',
-        'lingkaran': 'circle',
-        'panjang': 'length',
-        'lebar': 'width',
-        'sisi': 'side',
-        'alas': 'base', 
-        'tinggi': 'height',
-        'jari-jari': 'radius',
-        'mencari akar': 'square root',
-        'akar kuadrat': 'square root',
-        'akar': 'root',
-        'luas': 'area',
-        'keliling': 'perimeter'
-    }
-    
-    translated = line.lower()
-    
-    # Apply term-by-term translation
-    for indonesian, english in math_terms.items():
-        # Use word boundaries to avoid partial matches
-        pattern = r'\b' + re.escape(indonesian) + r'\b'
-        translated = re.sub(pattern, english, translated, flags=re.IGNORECASE)
+    # Istilah dari glossary.json, semua diganti dalam satu pass
+    translated = get_glossary('translation').translate(line.lower())
     
     # Preserve mathematical operators and fix spacing
-    translated = re.sub(r'\s*\*\*\s*', '**', translated)
-    translated = re.sub(r'\s*\*\s*', ' * ', translated)
-    translated = re.sub(r'\s*=\s*', ' = ', translated)
-    translated = re.sub(r'\s*/\s*', ' / ', translated)
-    translated = re.sub(r'\s*\+\s*', ' + ', translated)
-    translated = re.sub(r'\s*-\s*', ' - ', translated)
-    
-    # Fix parentheses
-    translated = re.sub(r'\s*\(\s*', '(', translated)
-    translated = re.sub(r'\s*\)\s*', ')', translated)
-    
-    # Clean up extra spaces
-    translated = re.sub(r'\s{2,}', ' ', translated)
-    
-    return translated.strip()
+    return TRANSLATED_LINE.normalize(translated)
 
 def extract_math_formulas(text):
     """
@@ -164,21 +136,7 @@ def extract_math_formulas(text):
         normalized_line = line.lower()
         
         # Apply Indonesian->English mapping for analysis
-        term_mappings = {
-            'persegi panjang': 'rectangle',
-            'persegi': 'square',
-            'segitiga': 'triangle',
-            'panjang': 'length',
-            'lebar': 'width',
-            'sisi': 'side',
-            'alas': 'base',
-            'tinggi': 'height',
-            'mencari akar': 'square_root'
-        }
-        
-        processed_line = normalized_line
-        for indonesian, english in term_mappings.items():
-            processed_line = processed_line.replace(indonesian, english)
+        processed_line = get_glossary('analysis').translate(normalized_line)
         
         # Enhanced pattern matching
         formula = extract_formula_from_line(processed_line, line, line_num)
@@ -270,65 +228,351 @@ def extract_formula_from_line(processed_line, original_line, line_num):
     
     return None
 
+def _numpy_function(name):
+    """NumPy variant of a function, numpy is imported on the first array call"""
+    def call(*args):
+        import numpy as np
+        return getattr(np, name)(*args)
+    return call
+
+def _numpy_log(value, base=None):
+    import numpy as np
+    if base is None:
+        return np.log(value)
+    return np.log(value) / np.log(base)
+
+# Functions an expression may call: name -> (for numbers, for NumPy arrays)
+FUNCTIONS = {
+    "sqrt": (math.sqrt, _numpy_function("sqrt")),
+    "sin": (math.sin, _numpy_function("sin")),
+    "cos": (math.cos, _numpy_function("cos")),
+    "tan": (math.tan, _numpy_function("tan")),
+    "asin": (math.asin, _numpy_function("arcsin")),
+    "acos": (math.acos, _numpy_function("arccos")),
+    "atan": (math.atan, _numpy_function("arctan")),
+    "log": (math.log, _numpy_log),
+    "log10": (math.log10, _numpy_function("log10")),
+    "log2": (math.log2, _numpy_function("log2")),
+    "exp": (math.exp, _numpy_function("exp")),
+    "abs": (abs, _numpy_function("abs")),
+    "floor": (math.floor, _numpy_function("floor")),
+    "ceil": (math.ceil, _numpy_function("ceil")),
+    "round": (round, _numpy_function("round")),
+    "hypot": (math.hypot, _numpy_function("hypot")),
+    "radians": (math.radians, _numpy_function("radians")),
+    "degrees": (math.degrees, _numpy_function("degrees")),
+    "min": (min, _numpy_function("minimum")),
+    "max": (max, _numpy_function("maximum")),
+}
+
+# Names that mean a constant unless the bindings give them a value
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+# Limits that keep a single expression from pinning a worker: the text
+# and its syntax tree are bounded before compiling, and integer results
+# are estimated before pow / multiplication compute them
+MAX_EXPRESSION_LENGTH = 500
+MAX_EXPRESSION_NODES = 256
+MAX_EXPRESSION_DEPTH = 100
+# results are shown with {:.4f}, a float has at most 309 digits before the point
+MAX_RESULT_DIGITS = 100
+MAX_RESULT_MAGNITUDE = 10 ** MAX_RESULT_DIGITS
+
+_evaluation = threading.local()
+
+def _check_deadline():
+    deadline = getattr(_evaluation, "deadline", None)
+    if deadline is not None and time.monotonic() > deadline:
+        raise TimeoutError("Evaluation took too long")
+
+@contextlib.contextmanager
+def evaluation_deadline(timeout):
+    """stop evaluations in this block after timeout seconds (None: no limit)"""
+    previous = getattr(_evaluation, "deadline", None)
+    _evaluation.deadline = time.monotonic() + timeout if timeout is not None else None
+    try:
+        yield
+    finally:
+        _evaluation.deadline = previous
+
+def _integer_digits(bits):
+    return bits * 0.30103  # log10(2)
+
+def _checked_pow(base, exponent):
+    _check_deadline()
+    if (isinstance(base, int) and isinstance(exponent, int)
+            and exponent > 0 and abs(base) > 1):
+        digits = exponent * math.log10(abs(base))
+        if digits > MAX_RESULT_DIGITS:
+            raise ValueError(f"Result would have about {digits:,.0f} digits, "
+                             f"the limit is {MAX_RESULT_DIGITS}")
+    try:
+        return base ** exponent
+    except OverflowError:
+        raise ValueError("Result is too large") from None
+
+def _checked_mul(left, right):
+    _check_deadline()
+    if isinstance(left, int) and isinstance(right, int):
+        digits = _integer_digits(left.bit_length() + right.bit_length())
+        if digits > MAX_RESULT_DIGITS + 1:
+            raise ValueError(f"Result would have about {digits:,.0f} digits, "
+                             f"the limit is {MAX_RESULT_DIGITS}")
+    return left * right
+
+def check_result(value):
+    """value if it is a number under the result limits, else ValueError"""
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError("Result is not a finite number")
+    if isinstance(value, (int, float)) and abs(value) >= MAX_RESULT_MAGNITUDE:
+        raise ValueError(f"Result has more than {MAX_RESULT_DIGITS} digits, "
+                         f"the limit is {MAX_RESULT_DIGITS}")
+    return value
+
+def check_expression_size(node):
+    """raise ValueError when a syntax tree is over the node or depth budget"""
+    count = 0
+    stack = [(node, 1)]
+    while stack:
+        current, depth = stack.pop()
+        count += 1
+        if count > MAX_EXPRESSION_NODES:
+            raise ValueError(f"Expression is too complex (more than {MAX_EXPRESSION_NODES} parts)")
+        if depth > MAX_EXPRESSION_DEPTH:
+            raise ValueError(f"Expression is nested too deeply (more than {MAX_EXPRESSION_DEPTH} levels)")
+        stack.extend((child, depth + 1) for child in ast.iter_child_nodes(current)
+                     if not isinstance(child, (ast.operator, ast.unaryop, ast.expr_context)))
+
+def normalize_expression(expr):
+    """collapse whitespace, the cache key of a compiled expression"""
+    return ' '.join(expr.split())
+
+class CompiledExpression:
+    """
+    An expression parsed once into a tree of closures. Calling it with a
+    dict of variable bindings evaluates it without parsing again.
+    """
+    
+    def __init__(self, text, evaluate, names):
+        self.text = text
+        self.names = names
+        self._evaluate = evaluate
+    
+    def __call__(self, variables=None):
+        return self._evaluate(variables if variables is not None else {})
+
 class MathExpressionEvaluator:
     """Safe mathematical expression evaluator"""
     
     operators = {
         ast.Add: operator.add,
         ast.Sub: operator.sub,
-        ast.Mult: operator.mul,
+        ast.Mult: _checked_mul,
         ast.Div: operator.truediv,
-        ast.Pow: operator.pow,
+        ast.Pow: _checked_pow,
         ast.USub: operator.neg,
         ast.UAdd: operator.pos,
     }
     
+    # normalized expression text -> CompiledExpression
+    compiled_cache = LRUCache(maxsize=1024)
+    
     @classmethod
-    def eval_expression(cls, expr, variables=None):
-        if variables is None:
-            variables = {}
-        
+    def eval_expression(cls, expr, variables=None, timeout=None):
+        """
+        Evaluate an expression, errors come back as an "Error ..." string.
+        timeout (seconds) is checked before every pow, multiplication and
+        function call; the size limits above keep each of them short.
+        """
         try:
-            expr = re.sub(r'sqrt\(([^)]+)\)', r'(\1)**0.5', expr)
-            
-            for var, val in variables.items():
-                expr = re.sub(r'\b' + re.escape(var) + r'\b', str(val), expr)
-            
-            node = ast.parse(expr, mode='eval')
-            return cls._eval_node(node.body)
+            compiled = cls.compile(expr)
+            with evaluation_deadline(timeout):
+                return check_result(compiled(variables))
         
         except Exception as e:
             return f"Error evaluating expression: {str(e)}"
     
     @classmethod
-    def _eval_node(cls, node):
+    def eval_vectorized(cls, expr, variables, timeout=None):
+        """
+        Evaluate an expression for NumPy arrays of values in one pass.
+        The arrays broadcast against each other; elements that divide by
+        zero or leave the real numbers come out as inf / nan.
+        """
+        import numpy as np
+        
+        arrays = {name: np.asarray(value, dtype=np.float64) for name, value in variables.items()}
+        shape = np.broadcast_shapes(*(array.shape for array in arrays.values()))
+        compiled = cls.compile(expr)
+        with np.errstate(all='ignore'), evaluation_deadline(timeout):
+            result = np.asarray(compiled(arrays), dtype=np.float64)
+        return np.broadcast_to(result, shape)
+    
+    @classmethod
+    def compile(cls, expr):
+        """
+        Compile an expression, or take it from the cache. Raises
+        SyntaxError / ValueError for expressions it can't evaluate.
+        """
+        key = normalize_expression(expr)
+        compiled = cls.compiled_cache.get(key)
+        if compiled is None:
+            if len(key) > MAX_EXPRESSION_LENGTH:
+                raise ValueError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+            node = ast.parse(key, mode='eval')
+            check_expression_size(node)
+            called = {id(n.func) for n in ast.walk(node) if isinstance(n, ast.Call)}
+            names = frozenset(n.id for n in ast.walk(node)
+                              if isinstance(n, ast.Name) and id(n) not in called and n.id not in CONSTANTS)
+            compiled = CompiledExpression(key, cls._compile_node(node.body), names)
+            cls.compiled_cache.put(key, compiled)
+        return compiled
+    
+    @classmethod
+    def _compile_node(cls, node):
+        """turn an AST node into a function of the variable bindings"""
         if isinstance(node, ast.Constant):
-            return node.value
-        elif isinstance(node, ast.Num):
-            return node.n
+            value = node.value
+            if isinstance(value, bool) or not isinstance(value, (int, float, complex)):
+                raise ValueError(f"Unsupported constant: {value!r}")
+            return lambda variables: value
+        elif isinstance(node, ast.Name):
+            name = node.id
+            if name in CONSTANTS:
+                value = CONSTANTS[name]
+                return lambda variables: variables.get(name, value)
+            def lookup(variables):
+                try:
+                    return variables[name]
+                except KeyError:
+                    raise ValueError(f"Missing value for variable: {name}") from None
+            return lookup
         elif isinstance(node, ast.BinOp):
-            left = cls._eval_node(node.left)
-            right = cls._eval_node(node.right)
+            left = cls._compile_node(node.left)
+            right = cls._compile_node(node.right)
             op = cls.operators.get(type(node.op))
-            if op:
-                if isinstance(node.op, ast.Div) and right == 0:
-                    raise ValueError("Division by zero")
-                return op(left, right)
-            else:
+            if not op:
                 raise ValueError(f"Unsupported operator: {type(node.op)}")
+            if isinstance(node.op, ast.Div):
+                def divide(variables):
+                    numerator, denominator = left(variables), right(variables)
+                    # arrays divide element-wise, see eval_vectorized
+                    if getattr(denominator, 'ndim', 0) == 0 and denominator == 0:
+                        raise ValueError("Division by zero")
+                    return numerator / denominator
+                return divide
+            return lambda variables: op(left(variables), right(variables))
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+                raise ValueError(f"Unknown function: {ast.unparse(node.func)}")
+            if node.keywords:
+                raise ValueError(f"{node.func.id}() takes no keyword arguments")
+            scalar_function, array_function = FUNCTIONS[node.func.id]
+            args = [cls._compile_node(arg) for arg in node.args]
+            def call(variables):
+                _check_deadline()
+                values = [arg(variables) for arg in args]
+                if any(getattr(value, 'ndim', 0) for value in values):
+                    return array_function(*values)
+                return scalar_function(*values)
+            return call
         elif isinstance(node, ast.UnaryOp):
-            operand = cls._eval_node(node.operand)
+            operand = cls._compile_node(node.operand)
             op = cls.operators.get(type(node.op))
-            if op:
-                return op(operand)
-            else:
+            if not op:
                 raise ValueError(f"Unsupported unary operator: {type(node.op)}")
+            return lambda variables: op(operand(variables))
         else:
             raise ValueError(f"Unsupported node type: {type(node)}")
+    
+    @classmethod
+    def _eval_node(cls, node, variables=None):
+        return cls._compile_node(node)(variables if variables is not None else {})
+
+# Value ranges in a message: radius=1..100 step 0.5
+RANGE_PATTERN = r'(\w+)\s*=\s*(-?\d+(?:\.\d+)?)\s*\.\.\s*(-?\d+(?:\.\d+)?)(?:\s*step\s*(\d+(?:\.\d+)?))?'
+
+# Largest grid of values evaluated for one message
+MAX_GRID_POINTS = 100000
+
+def range_values(start, stop, step=1.0):
+    """start, start + step, ... up to and including stop as a NumPy array"""
+    import numpy as np
+    
+    if step <= 0:
+        raise ValueError("Step must be positive")
+    if stop < start:
+        raise ValueError(f"Range end {stop} is below its start {start}")
+    count = int(math.floor((stop - start) / step + 1e-9)) + 1
+    if count > MAX_GRID_POINTS:
+        raise ValueError(f"Range {start}..{stop} step {step} has {count} values, the limit is {MAX_GRID_POINTS}")
+    return start + step * np.arange(count, dtype=np.float64)
+
+def build_grid(ranges, max_points=MAX_GRID_POINTS):
+    """
+    Every combination of the ranges ({name: (start, stop, step)}),
+    returned as one flat array per name.
+    """
+    import numpy as np
+    
+    axes = {name: range_values(*spec) for name, spec in ranges.items()}
+    points = math.prod(len(values) for values in axes.values())
+    if points > max_points:
+        raise ValueError(f"The ranges give {points} combinations, the limit is {max_points}")
+    grids = np.meshgrid(*axes.values(), indexing='ij')
+    return {name: grid.ravel() for name, grid in zip(axes, grids)}
+
+def summarize_values(values):
+    """min / max / mean over the finite values"""
+    import numpy as np
+    
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        return {"count": len(values), "invalid": len(values)}
+    return {
+        "count": len(values),
+        "invalid": len(values) - len(finite),
+        "min": float(finite.min()),
+        "max": float(finite.max()),
+        "mean": float(finite.mean()),
+    }
+
+def format_value_table(columns, max_rows=10):
+    """
+    Text table of (label, array) columns of the same length; long tables
+    show their first and last rows only.
+    """
+    count = len(columns[0][1])
+    if count > max_rows:
+        rows = list(range(max_rows // 2)) + [None] + list(range(count - max_rows // 2, count))
+    else:
+        rows = list(range(count))
+    
+    lines = ["| " + " | ".join(label for label, values in columns) + " |"]
+    for row in rows:
+        if row is None:
+            lines.append("| " + " | ".join("..." for column in columns) + " |")
+        else:
+            lines.append("| " + " | ".join(f"{values[row]:.4f}" for label, values in columns) + " |")
+    return "\n".join(lines)
 
 def parse_user_math_input(message):
     """Parse user input for math operations"""
     var_pattern = r'(\w+)\s*=\s*(\d+(?:\.\d+)?)'
+    
+    # value ranges: "radius=1..100 step 0.5", "calculate x**2 for x=0..10"
+    ranges = re.findall(RANGE_PATTERN, message.lower())
+    if ranges:
+        remaining = re.sub(RANGE_PATTERN, ' ', message.lower())
+        expression_match = re.search(r'(?:calculate|compute|solve|evaluate)\s+(.+?)\s+(?:for|with|where)\b', remaining)
+        return {
+            'type': 'range_evaluation',
+            'ranges': {var: (float(start), float(stop), float(step) if step else 1.0)
+                       for var, start, stop, step in ranges},
+            'variables': {var: float(val) for var, val in re.findall(var_pattern, remaining)},
+            'expression': expression_match.group(1).strip() if expression_match else None
+        }
+    
     variables = re.findall(var_pattern, message.lower())
     
     if variables:
@@ -385,41 +629,43 @@ def process_pdf_with_math(file_path):
     
     return result
 
+def formula_expression(formula_dict):
+    """the right-hand side of an extracted formula, ready to compile"""
+    expression = formula_dict['formula'].split('=', 1)[1]
+    # PDF text cleaning splits ** into "* *"
+    return re.sub(r'\*\s+\*', '**', expression).strip()
+
+def formula_bindings(values):
+    """
+    float values by variable name, Indonesian names (panjang, lebar)
+    also bound under the English names extracted formulas use
+    """
+    analysis_terms = get_glossary('analysis').terms
+    bindings = {}
+    for name, value in values.items():
+        name = name.lower()
+        bindings[name] = float(value)
+        bindings.setdefault(analysis_terms.get(name, name), float(value))
+    return bindings
+
 def calculate_math_expression(formula_dict, values):
-    """Calculate simple mathematical expression"""
+    """Calculate an extracted formula (from extract_math_formulas) with the given values"""
     try:
-        var1 = formula_dict['variable1']
-        var2 = formula_dict['variable2'] 
-        operator_sym = formula_dict['operator']
-        
-        if var1 in values and var2 in values:
-            val1 = float(values[var1])
-            val2 = float(values[var2])
-            
-            if operator_sym == '+':
-                result = val1 + val2
-            elif operator_sym == '-':
-                result = val1 - val2
-            elif operator_sym == '*':
-                result = val1 * val2
-            elif operator_sym == '/':
-                if val2 != 0:
-                    result = val1 / val2
-                else:
-                    return "Error: Division by zero"
-            elif operator_sym == '**':
-                result = val1 ** val2
-            else:
-                return f"Error: Unsupported operator {operator_sym}"
-                
-            return f"{formula_dict['result']} = {val1} {operator_sym} {val2} = {result:.4f}"
+        if 'operator' in formula_dict:
+            # {'variable1', 'operator', 'variable2'} dicts
+            expression = f"{formula_dict['variable1']} {formula_dict['operator']} {formula_dict['variable2']}"
         else:
-            missing_vars = []
-            if var1 not in values:
-                missing_vars.append(var1)
-            if var2 not in values:
-                missing_vars.append(var2)
+            expression = formula_expression(formula_dict)
+        compiled = MathExpressionEvaluator.compile(expression)
+        bindings = formula_bindings(values)
+        
+        missing_vars = sorted(name for name in compiled.names if name not in bindings)
+        if missing_vars:
             return f"Missing values for: {', '.join(missing_vars)}"
+        
+        result = check_result(compiled(bindings))
+        shown = re.sub(r'\b\w+\b', lambda m: str(bindings.get(m.group(0), m.group(0))), compiled.text)
+        return f"{formula_dict['result']} = {shown} = {result:.4f}"
             
     except Exception as e:
         return f"Calculation error: {str(e)}"
@@ -1,6 +1,11 @@
+import math
+import warnings
+
 import torch
 import torch.nn as nn
 
+from model_artifact import ARTIFACT_FILE, read_artifact
+
 
 class NeuralNet(nn.Module):
     def __init__(self, input_size, hidden_size, num_classes):
@@ -18,3 +23,71 @@ class NeuralNet(nn.Module):
         out = self.l3(out)
         # no activation and no softmax at the end
         return out
+
+
+class SparseNeuralNet(nn.Module):
+    """
+    NeuralNet taking the active word indices instead of the dense bag of
+    words. The EmbeddingBag sum over the active words is the same as the
+    dense first layer on a 0/1 bag, but costs O(active words) instead of
+    O(vocabulary).
+    """
+    def __init__(self, input_size, hidden_size, num_classes):
+        super(SparseNeuralNet, self).__init__()
+        self.l1 = nn.EmbeddingBag(input_size, hidden_size, mode='sum')
+        self.l1_bias = nn.Parameter(torch.empty(hidden_size))
+        self.l2 = nn.Linear(hidden_size, hidden_size) 
+        self.l3 = nn.Linear(hidden_size, num_classes)
+        self.relu = nn.ReLU()
+        # same initialization as the nn.Linear first layer of NeuralNet
+        bound = 1 / math.sqrt(input_size)
+        nn.init.uniform_(self.l1.weight, -bound, bound)
+        nn.init.uniform_(self.l1_bias, -bound, bound)
+    
+    def forward(self, indices, offsets):
+        out = self.l1(indices, offsets) + self.l1_bias
+        out = self.relu(out)
+        out = self.l2(out)
+        out = self.relu(out)
+        out = self.l3(out)
+        # no activation and no softmax at the end
+        return out
+
+
+MODEL_TYPES = {
+    "dense": NeuralNet,
+    "sparse": SparseNeuralNet,
+}
+
+
+def build_model(model_type, input_size, hidden_size, num_classes):
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"Unknown model type '{model_type}', use one of {list(MODEL_TYPES)}")
+    return MODEL_TYPES[model_type](input_size, hidden_size, num_classes)
+
+
+
+def load_artifact_model(artifact_file=ARTIFACT_FILE):
+    """
+    Build the model stored in a model artifact (numpy_model.export_weights),
+    returns it with the artifact metadata. The parameters are the
+    memory-mapped arrays themselves, not copies, so forked workers share
+    the weight pages.
+    """
+    arrays, meta = read_artifact(artifact_file, mmap=True)
+    model_type = meta.get("model_type", "dense")
+    if model_type == "sparse":
+        # the artifact has the NeuralNet layout, see numpy_model.dense_model_state
+        arrays = dict(arrays)
+        arrays["l1.weight"] = arrays["l1.weight"].T
+        arrays["l1_bias"] = arrays.pop("l1.bias")
+    with warnings.catch_warnings():
+        # the mapping is read-only, inference never writes to the weights
+        warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+        model_state = {name: torch.from_numpy(array) for name, array in arrays.items()}
+    # parameters on the meta device allocate nothing before they are replaced
+    with torch.device("meta"):
+        model = build_model(model_type, meta["input_size"], meta["hidden_size"], meta["output_size"])
+    model.load_state_dict(model_state, assign=True)
+    model.eval()
+    return model, meta
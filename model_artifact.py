@@ -0,0 +1,101 @@
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+# Layout of a model artifact:
+#   8 bytes   magic
+#   8 bytes   little endian length of the JSON header
+#   header    JSON: format version, metadata, offset/shape/dtype per array
+#   arrays    raw C-order data, every array starts on an ALIGNMENT boundary
+# No pickle anywhere, and the arrays can be memory-mapped straight from
+# the file so forked workers share the same page cache pages.
+MAGIC = b"CHATMDL\x00"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+ARTIFACT_FILE = "data.bin"
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_artifact(path, arrays, meta):
+    """
+    Write arrays (name -> numeric ndarray) and a JSON-serializable meta
+    dict. The file is written next to path and renamed over it, so
+    readers see either the old or the new artifact, never half of one.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        if array.dtype.hasobject or array.dtype.kind in "US":
+            raise ValueError(f"Array '{name}' must be numeric, put strings in meta")
+        layout[name] = {"offset": offset, "shape": list(array.shape), "dtype": array.dtype.str}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({
+        "format_version": FORMAT_VERSION,
+        "meta": meta,
+        "arrays": layout,
+    }).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".bin")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(array.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file private to the owner
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def read_artifact(path, mmap=True):
+    """
+    Read an artifact, returns (arrays, meta). With mmap the arrays are
+    read-only views of a memory-mapped file instead of copies.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not a model artifact")
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length).decode("utf-8"))
+
+    if header["format_version"] > FORMAT_VERSION:
+        raise ValueError(f"'{path}' uses artifact format {header['format_version']}, "
+                         f"this version reads up to {FORMAT_VERSION}")
+
+    data_start = _align(len(MAGIC) + 8 + header_length)
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        with open(path, "rb") as f:
+            buffer = np.frombuffer(f.read(), dtype=np.uint8)
+
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        if count == 0:
+            arrays[name] = np.empty(entry["shape"], dtype=dtype)
+            continue
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                     offset=data_start + entry["offset"]).reshape(entry["shape"])
+    return arrays, header["meta"]
@@ -1,8 +1,45 @@
+from itertools import chain
+
 import numpy as np
-import nltk
+
+from cache_utils import LRUCache
+
+# nltk is imported on first use, a routed chat message never needs it
 # nltk.download('punkt')
-from nltk.stem.porter import PorterStemmer
-stemmer = PorterStemmer()
+stemmer = None
+
+# chat traffic repeats a small vocabulary, so stems are memoized;
+# whole-message tokenization caching is off until configure_caches() sizes it
+stem_cache = LRUCache(maxsize=10000)
+tokenize_cache = LRUCache(maxsize=0)
+
+
+def get_stemmer():
+    global stemmer
+    if stemmer is None:
+        from nltk.stem.porter import PorterStemmer
+        stemmer = PorterStemmer()
+    return stemmer
+
+
+def configure_caches(stem_size=None, tokenize_size=None):
+    """resize the stem / tokenize caches, a size of 0 disables a cache"""
+    if stem_size is not None:
+        stem_cache.resize(stem_size)
+    if tokenize_size is not None:
+        tokenize_cache.resize(tokenize_size)
+
+
+def seed_stem_cache(words):
+    """warm the stem cache with known words, e.g. all_words from data.pth"""
+    stem_word = get_stemmer().stem
+    for word in words:
+        stem_cache.put(word, stem_word(word.lower()))
+
+
+def cache_stats():
+    """hit / miss / eviction counters of the stem and tokenize caches"""
+    return {"stem": stem_cache.stats(), "tokenize": tokenize_cache.stats()}
 
 
 def tokenize(sentence):
@@ -10,7 +47,14 @@ def tokenize(sentence):
     split sentence into array of words/tokens
     a token can be a word or punctuation character, or number
     """
-    return nltk.word_tokenize(sentence)
+    tokens = tokenize_cache.get(sentence)
+    if tokens is None:
+        import nltk
+        tokens = nltk.word_tokenize(sentence)
+        tokenize_cache.put(sentence, tuple(tokens))
+        return tokens
+    # hand out a fresh list so callers can't modify the cached tokens
+    return list(tokens)
 
 
 def stem(word):
@@ -21,7 +65,145 @@ def stem(word):
     words = [stem(w) for w in words]
     -> ["organ", "organ", "organ"]
     """
-    return stemmer.stem(word.lower())
+    stemmed = stem_cache.get(word)
+    if stemmed is None:
+        stemmed = get_stemmer().stem(word.lower())
+        stem_cache.put(word, stemmed)
+    return stemmed
+
+
+class BagOfWordsEncoder:
+    """
+    Bag of words encoder built once from the vocabulary (all_words).
+    Keeps a word -> column dictionary so encoding a sentence costs
+    O(len(sentence)) instead of O(len(words) * len(sentence)).
+    example:
+    encoder = BagOfWordsEncoder(["hi", "hello", "I", "you", "bye", "thank", "cool"])
+    encoder.indices(["hello", "how", "are", "you"]) -> [1, 3]
+    encoder.encode(["hello", "how", "are", "you"])  -> [0, 1, 0, 1, 0, 0, 0]
+    """
+
+    def __init__(self, words):
+        self.words = list(words)
+        self.vocab_size = len(self.words)
+        self.word_index = {}
+        for idx, w in enumerate(self.words):
+            # keep every column of a duplicated word, like bag_of_words does
+            self.word_index.setdefault(w, []).append(idx)
+
+    def indices(self, tokenized_sentence):
+        """
+        return the sorted column indices of the known words in the sentence
+        (sparse form of the bag of words)
+        """
+        active = set()
+        for word in tokenized_sentence:
+            columns = self.word_index.get(stem(word))
+            if columns:
+                active.update(columns)
+        return sorted(active)
+
+    def encode(self, tokenized_sentence):
+        """
+        return the dense float32 bag of words array for the sentence
+        """
+        bag = np.zeros(self.vocab_size, dtype=np.float32)
+        bag[self.indices(tokenized_sentence)] = 1
+        return bag
+
+    def encode_batch(self, tokenized_sentences):
+        """
+        return the bag of words of many sentences as a SparseBagMatrix.
+        Every distinct token is stemmed and looked up once, the rest is
+        done with array operations over all tokens at the same time.
+        """
+        tokenized_sentences = list(tokenized_sentences)
+        n_rows = len(tokenized_sentences)
+        lengths = np.fromiter((len(s) for s in tokenized_sentences), dtype=np.int64, count=n_rows)
+
+        token_ids = {}
+        flat_ids = np.fromiter(
+            (token_ids.setdefault(word, len(token_ids))
+             for word in chain.from_iterable(tokenized_sentences)),
+            dtype=np.int64, count=int(lengths.sum()))
+
+        if any(len(columns) > 1 for columns in self.word_index.values()):
+            # duplicated vocabulary words own several columns
+            indptr = [0]
+            indices = []
+            for sentence in tokenized_sentences:
+                indices.extend(self.indices(sentence))
+                indptr.append(len(indices))
+            return SparseBagMatrix(indptr, indices, self.vocab_size)
+
+        token_columns = np.fromiter(
+            (self.word_index.get(stem(word), [-1])[0] for word in token_ids),
+            dtype=np.int64, count=len(token_ids))
+
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), lengths)
+        columns = token_columns[flat_ids]
+        known = columns >= 0
+        # unique (row, column) pairs, sorted by row then column
+        cells = np.unique(rows[known] * self.vocab_size + columns[known])
+        rows, columns = np.divmod(cells, self.vocab_size)
+
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        return SparseBagMatrix(indptr, columns, self.vocab_size)
+
+
+class SparseBagMatrix:
+    """
+    Bag of words rows in CSR form: the active columns of row i are
+    indices[indptr[i]:indptr[i + 1]], every active cell is 1
+    """
+
+    def __init__(self, indptr, indices, n_columns):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.shape = (len(self.indptr) - 1, n_columns)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def row(self, idx):
+        return self.indices[self.indptr[idx]:self.indptr[idx + 1]]
+
+    def select_rows(self, rows):
+        """new SparseBagMatrix with the given rows, in that order"""
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        # position of every selected cell in self.indices
+        cells = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return SparseBagMatrix(indptr, self.indices[cells], self.shape[1])
+
+    def to_dense(self):
+        dense = np.zeros(self.shape, dtype=np.float32)
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        dense[rows, self.indices] = 1
+        return dense
+
+    def to_bag_inputs(self, device=None):
+        """(indices, offsets) tensors for nn.EmbeddingBag / SparseNeuralNet"""
+        import torch
+
+        indices = torch.from_numpy(self.indices).to(device)
+        offsets = torch.from_numpy(self.indptr[:-1]).to(device)
+        return indices, offsets
+
+    def to_torch(self, device=None):
+        """sparse COO float32 tensor, nn.Linear accepts it as input"""
+        import torch
+
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        coords = torch.from_numpy(np.stack([rows, self.indices]))
+        values = torch.ones(len(self.indices), dtype=torch.float32)
+        tensor = torch.sparse_coo_tensor(coords, values, self.shape, device=device,
+                                         check_invariants=False)
+        return tensor.coalesce()
 
 
 def bag_of_words(tokenized_sentence, words):
@@ -32,13 +214,6 @@ def bag_of_words(tokenized_sentence, words):
     sentence = ["hello", "how", "are", "you"]
     words = ["hi", "hello", "I", "you", "bye", "thank", "cool"]
     bog   = [  0 ,    1 ,    0 ,   1 ,    0 ,    0 ,      0]
+    for repeated calls with the same words, build a BagOfWordsEncoder once
     """
-    # stem each word
-    sentence_words = [stem(word) for word in tokenized_sentence]
-    # initialize bag with 0 for each word
-    bag = np.zeros(len(words), dtype=np.float32)
-    for idx, w in enumerate(words):
-        if w in sentence_words: 
-            bag[idx] = 1
-
-    return bag
+    return BagOfWordsEncoder(words).encode(tokenized_sentence)
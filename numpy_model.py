@@ -0,0 +1,109 @@
+import hashlib
+
+import numpy as np
+
+from model_artifact import ARTIFACT_FILE, read_artifact, write_artifact
+
+NUMPY_FILE = ARTIFACT_FILE
+
+
+class NumpyNeuralNet:
+    """
+    NumPy-only version of model.NeuralNet (3 linear layers with ReLU)
+    used for inference when torch is not installed.
+    Takes a dense bag of words matrix (forward) or the active word indices
+    of a SparseBagMatrix (forward_sparse).
+    """
+
+    def __init__(self, model_state):
+        self.l1_weight = np.asarray(model_state["l1.weight"], dtype=np.float32)
+        self.l1_bias = np.asarray(model_state["l1.bias"], dtype=np.float32)
+        self.l2_weight = np.asarray(model_state["l2.weight"], dtype=np.float32)
+        self.l2_bias = np.asarray(model_state["l2.bias"], dtype=np.float32)
+        self.l3_weight = np.asarray(model_state["l3.weight"], dtype=np.float32)
+        self.l3_bias = np.asarray(model_state["l3.bias"], dtype=np.float32)
+
+    def forward(self, x):
+        out = x @ self.l1_weight.T + self.l1_bias
+        out = np.maximum(out, 0)
+        out = out @ self.l2_weight.T + self.l2_bias
+        out = np.maximum(out, 0)
+        out = out @ self.l3_weight.T + self.l3_bias
+        # no activation and no softmax at the end
+        return out
+
+    __call__ = forward
+
+    def forward_sparse(self, bags):
+        """same as forward(bags.to_dense()), summing only the active columns"""
+        rows = np.repeat(np.arange(len(bags)), np.diff(bags.indptr))
+        out = np.zeros((len(bags), len(self.l1_bias)), dtype=np.float32)
+        np.add.at(out, rows, self.l1_weight.T[bags.indices])
+        out += self.l1_bias
+        out = np.maximum(out, 0)
+        out = out @ self.l2_weight.T + self.l2_bias
+        out = np.maximum(out, 0)
+        out = out @ self.l3_weight.T + self.l3_bias
+        return out
+
+
+def softmax(x, axis=1):
+    """numerically stable softmax, same as torch.softmax"""
+    shifted = x - np.max(x, axis=axis, keepdims=True)
+    exps = np.exp(shifted)
+    return exps / np.sum(exps, axis=axis, keepdims=True)
+
+
+def dense_model_state(model_state, model_type="dense"):
+    """
+    NeuralNet layout of a model_state as arrays: the EmbeddingBag of a
+    SparseNeuralNet is stored transposed with a separate bias
+    """
+    arrays = {
+        name: tensor.detach().cpu().numpy()
+        for name, tensor in model_state.items()
+    }
+    if model_type == "sparse":
+        arrays["l1.weight"] = arrays["l1.weight"].T.copy()
+        arrays["l1.bias"] = arrays.pop("l1_bias")
+    return arrays
+
+
+def export_weights(pth_file="data.pth", artifact_file=NUMPY_FILE):
+    """
+    Convert the torch checkpoint written by train.py into a model
+    artifact of plain arrays (needs torch, only the export step does)
+    """
+    import torch
+
+    data = torch.load(pth_file)
+    arrays = dense_model_state(data["model_state"], data.get("model_type", "dense"))
+    version = hashlib.sha256()
+    for name in sorted(arrays):
+        version.update(name.encode("utf-8"))
+        version.update(np.ascontiguousarray(arrays[name]).tobytes())
+    meta = {
+        "model_version": version.hexdigest(),
+        "model_type": data.get("model_type", "dense"),
+        "input_size": data["input_size"],
+        "hidden_size": data["hidden_size"],
+        "output_size": data["output_size"],
+        "all_words": data["all_words"],
+        "tags": data["tags"],
+    }
+    return write_artifact(artifact_file, arrays, meta)
+
+
+def load_weights(artifact_file=NUMPY_FILE, mmap=True):
+    """
+    Load an exported model, returns the same keys as the torch checkpoint
+    with a ready NumpyNeuralNet under "model". The weights stay
+    memory-mapped unless mmap is False.
+    """
+    arrays, meta = read_artifact(artifact_file, mmap=mmap)
+    return {"model": NumpyNeuralNet(arrays), **meta}
+
+
+if __name__ == "__main__":
+    FILE = export_weights()
+    print(f'export complete. file saved to {FILE}')
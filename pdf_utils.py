@@ -1,4 +1,3 @@
-import fitz
 import re
 import os
 from preprocessing import clean_pdf_extracted_text, normalize_formula_text
@@ -11,6 +10,9 @@ def extract_text_from_pdf(file_path):
         if not os.path.exists(file_path):
             return f"Error: File '{file_path}' not found."
         
+        # PyMuPDF is only imported once a PDF is actually opened
+        import fitz
+
         # Open PDF
         doc = fitz.open(file_path)
         all_text = ""
@@ -0,0 +1,104 @@
+import re
+
+# group numbers shift once a route is wrapped in the combined matcher,
+# so routes can't refer to groups by number: \1 or (?(1)...)
+NUMBERED_GROUP_REFERENCE = re.compile(r'(?<!\\)(?:\\\\)*(?:\\[1-9]|\(\?\(\d)')
+# the combined matcher names the group of route n "r<n>"
+ROUTE_GROUP_NAME = re.compile(r'r\d+')
+
+
+class Route:
+    def __init__(self, name, handler, pattern):
+        self.name = name
+        self.handler = handler
+        self.pattern = pattern
+
+
+class MessageRouter:
+    """
+    Declarative route table for messages that don't need NLU.
+    Every route is a regex (or a keyword list) plus a handler. All routes
+    are compiled into one combined matcher, so classifying a message is a
+    single scan over its lowercased text no matter how many routes exist.
+    When several routes match, the one registered first wins.
+    example:
+    router = MessageRouter()
+    router.add_route("pdf", handle_pdf, keywords=["extract pdf"])
+    router.add_route("calc", handle_calc, pattern=r"\bcalculate\b")
+    router.dispatch("calculate 2 + 3") -> handle_calc("calculate 2 + 3")
+    """
+
+    def __init__(self):
+        self.routes = []
+        self._matcher = None
+
+    def add_route(self, name, handler, pattern=None, keywords=None, priority=None):
+        """
+        register a route, matched against the lowercased message
+        priority is the position in the table (default: after all others)
+        patterns may use groups, but no numbered backreferences, no group
+        named r<number> and no global inline flags like (?i), they clash
+        with the combined matcher
+        """
+        if pattern is None:
+            if not keywords:
+                raise ValueError(f"Route '{name}' needs a pattern or keywords")
+            pattern = '|'.join(re.escape(keyword.lower()) for keyword in keywords)
+        compiled = re.compile(pattern)  # fail early on invalid patterns
+        if NUMBERED_GROUP_REFERENCE.search(pattern):
+            raise ValueError(f"Route '{name}' uses a numbered group reference, name the group instead")
+        if any(ROUTE_GROUP_NAME.fullmatch(group) for group in compiled.groupindex):
+            raise ValueError(f"Route '{name}' uses a group name reserved by the router")
+        
+        route = Route(name, handler, pattern)
+        previous = self.routes
+        self.routes = previous[:]
+        if priority is None:
+            self.routes.append(route)
+        else:
+            self.routes.insert(priority, route)
+        # a pattern can compile alone and still break the combined
+        # matcher, "(?i)..." flags must be at its start
+        try:
+            self.compile()
+        except re.error as e:
+            self.routes = previous
+            self._matcher = None
+            raise ValueError(f"Route '{name}' can't be combined with the other routes: {e}") from None
+        return route
+
+    def remove_route(self, name):
+        self.routes = [route for route in self.routes if route.name != name]
+        self._matcher = None
+
+    def compile(self):
+        """
+        build the combined matcher: one zero-width alternative per route,
+        tried in priority order at every position of the message
+        """
+        alternatives = '|'.join(
+            f'(?P<r{idx}>{route.pattern})' for idx, route in enumerate(self.routes)
+        )
+        self._matcher = re.compile(f'(?=(?:{alternatives}))') if self.routes else None
+        return self._matcher
+
+    def match(self, message):
+        """return the highest priority route matching the message, or None"""
+        if self._matcher is None and not self.compile():
+            return None
+        
+        best = None
+        for match in self._matcher.finditer(message.lower()):
+            idx = int(match.lastgroup[1:])
+            if best is None or idx < best:
+                best = idx
+                if best == 0:
+                    break
+        return self.routes[best] if best is not None else None
+
+    def dispatch(self, message):
+        """run the handler of the matching route, None if nothing matches"""
+        route = self.match(message)
+        if route is None:
+            return None
+        return route.handler(message)
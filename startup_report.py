@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Startup report: import time and RSS per component of chat.py.
+Runs in a fresh process so the numbers are those of a cold worker;
+every component is loaded the way chat.py would load it on first use.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+WORKER_CODE = r'''
+import json, os, sys, time
+start_time = time.perf_counter()
+
+def rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def import_nltk():
+    import nltk
+    import nltk_utils
+    nltk_utils.get_stemmer()
+
+def import_fitz():
+    import fitz
+
+def load_translator():
+    import math_utils
+    math_utils.get_translator()
+
+def import_chat():
+    import chat
+    if sys.argv[1]:
+        chat.ENGINE = sys.argv[1]
+
+def load_engine():
+    import chat
+    chat.load_engine()
+
+def load_model():
+    import chat
+    chat.init()
+
+def route_calculation():
+    import chat
+    chat.get_response("calculate 2 + 3")
+
+def answer_nlu():
+    import chat
+    chat.get_response("tell me what kind of things you sell")
+
+steps = [
+    ("import chat", import_chat),
+    ("first routed answer (calculate 2 + 3)", route_calculation),
+    ("nltk", import_nltk),
+    ("inference engine (CHAT_ENGINE)", load_engine),
+    ("model + intents.json", load_model),
+    ("first NLU answer", answer_nlu),
+    ("googletrans Translator", load_translator),
+    ("PyMuPDF (fitz)", import_fitz),
+]
+if sys.argv[2] == "routed":
+    steps = steps[:2]
+
+results = [{"component": "python interpreter", "seconds": None, "rss": rss()}]
+for name, load in steps:
+    before, start = rss(), time.perf_counter()
+    try:
+        load()
+        error = None
+    except Exception as e:
+        first_line = next((line.strip() for line in str(e).splitlines() if line.strip(" *")), "")
+        error = f"{type(e).__name__}: {first_line}"
+    results.append({"component": name, "seconds": time.perf_counter() - start,
+                    "rss": rss() - before, "error": error})
+print(json.dumps({"steps": results, "total": time.perf_counter() - start_time, "rss": rss()}))
+'''
+
+
+def run_worker(engine, mode):
+    output = subprocess.run([sys.executable, "-c", WORKER_CODE, engine or "", mode],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def print_report(title, report):
+    print(title)
+    print(f"{'component':<40}{'time':>10}{'RSS':>12}")
+    for step in report["steps"]:
+        seconds = "-" if step["seconds"] is None else f"{step['seconds'] * 1000:.0f}ms"
+        rss = f"{'+' if step['seconds'] is not None else ''}{step['rss'] / 2**20:.1f}MB"
+        print(f"{step['component']:<40}{seconds:>10}{rss:>12}")
+        if step.get("error"):
+            print(f"  ❌ {step['error']}")
+    print(f"{'total':<40}{report['total'] * 1000:>8.0f}ms{report['rss'] / 2**20:>10.1f}MB\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import time and RSS per component of chat.py")
+    parser.add_argument("--engine", choices=["torch", "torchscript", "numpy"], default=None,
+                        help="default: CHAT_ENGINE or torch")
+    parser.add_argument("--json", action="store_true", help="print the raw measurements")
+    args = parser.parse_args()
+
+    reports = {
+        "routed": run_worker(args.engine, "routed"),
+        "full": run_worker(args.engine, "full"),
+    }
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print_report("🚀 Cold worker answering only routed messages", reports["routed"])
+        print_report("📦 Cold worker loading every component", reports["full"])
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter sweep for the intent classifier.
+Trains every configuration of the grid in parallel (one process per CPU
+core) on a held-out split of the intents.json patterns and reports
+accuracy, training time and per-message inference latency.
+"""
+
+import argparse
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+
+from nltk_utils import BagOfWordsEncoder, stem
+from train import load_intents, prepare_corpus, train_model
+
+IGNORE_WORDS = ['?', '.', '!']
+
+
+def split_patterns(xy, test_fraction=0.25, seed=0):
+    """
+    stratified split of the (tokenized pattern, tag) pairs: every tag
+    keeps at least one training pattern
+    """
+    rng = random.Random(seed)
+    by_tag = {}
+    for pair in xy:
+        by_tag.setdefault(pair[1], []).append(pair)
+
+    train_xy, test_xy = [], []
+    for tag in sorted(by_tag):
+        pairs = by_tag[tag][:]
+        rng.shuffle(pairs)
+        n_test = min(int(round(len(pairs) * test_fraction)), len(pairs) - 1)
+        test_xy.extend(pairs[:n_test])
+        train_xy.extend(pairs[n_test:])
+    return train_xy, test_xy
+
+
+def build_split_data(intents, test_fraction=0.25, seed=0):
+    """bag of words matrices for both splits, vocabulary from the training split only"""
+    _, tags, xy = prepare_corpus(intents)
+    train_xy, test_xy = split_patterns(xy, test_fraction, seed)
+
+    all_words = sorted({stem(w) for (words, tag) in train_xy for w in words
+                        if w not in IGNORE_WORDS})
+    bag_encoder = BagOfWordsEncoder(all_words)
+    tag_to_id = {tag: idx for idx, tag in enumerate(tags)}
+
+    def encode(pairs):
+        X = bag_encoder.encode_batch(words for (words, tag) in pairs)
+        y = np.array([tag_to_id[tag] for (words, tag) in pairs], dtype=np.int64)
+        return X, y
+
+    return encode(train_xy), encode(test_xy), len(tags)
+
+
+def run_config(config, train_data, test_data, num_classes, seed=0, latency_repeats=200):
+    """train one configuration and measure it, runs inside a worker process"""
+    torch.set_num_threads(1)
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+
+    X_train, y_train = train_data
+    X_test, y_test = test_data
+    dense = config["model_type"] == "dense"
+
+    model, stats = train_model(X_train if not dense else X_train.to_dense(), y_train,
+                               num_classes,
+                               num_epochs=config["num_epochs"],
+                               batch_size=config["batch_size"],
+                               learning_rate=config["learning_rate"],
+                               hidden_size=config["hidden_size"],
+                               full_batch=config["full_batch"],
+                               patience=config["patience"],
+                               model_type=config["model_type"],
+                               device=torch.device('cpu'),
+                               verbose=False)
+    model.eval()
+
+    def forward(bags):
+        if dense:
+            return model(torch.from_numpy(bags.to_dense()))
+        return model(*bags.to_bag_inputs())
+
+    with torch.no_grad():
+        predicted = forward(X_test).argmax(dim=1).numpy() if len(X_test) else np.array([])
+        accuracy = float((predicted == y_test).mean()) if len(y_test) else float('nan')
+
+        # one message per call, like chat.get_response
+        message = X_test.select_rows([0]) if len(X_test) else X_train.select_rows([0])
+        forward(message)
+        start = time.perf_counter()
+        for _ in range(latency_repeats):
+            forward(message)
+        latency = (time.perf_counter() - start) / latency_repeats
+
+    return {
+        **config,
+        "accuracy": accuracy,
+        "train_time": stats["train_time"],
+        "epochs": stats["epochs"],
+        "latency": latency,
+        "parameters": sum(p.numel() for p in model.parameters()),
+    }
+
+
+def sweep(grid, intents_file='intents.json', test_fraction=0.25, seed=0, workers=None):
+    """train every configuration of the grid in a process pool, returns the results"""
+    intents = load_intents(intents_file)
+    train_data, test_data, num_classes = build_split_data(intents, test_fraction, seed)
+
+    keys = list(grid)
+    configs = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    # full batch ignores batch_size, don't train the same model twice
+    seen = set()
+    unique_configs = []
+    for config in configs:
+        if config["full_batch"]:
+            config["batch_size"] = len(train_data[1])
+        key = tuple(sorted(config.items()))
+        if key not in seen:
+            seen.add(key)
+            unique_configs.append(config)
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(run_config, config, train_data, test_data, num_classes, seed)
+            for config in unique_configs
+        ]
+        return [future.result() for future in futures]
+
+
+def best_config(results, min_accuracy):
+    """smallest, then fastest configuration that meets the accuracy bar"""
+    passing = [r for r in results if r["accuracy"] >= min_accuracy]
+    if not passing:
+        return None
+    return min(passing, key=lambda r: (r["parameters"], r["latency"], r["train_time"]))
+
+
+def print_results(results, min_accuracy):
+    print(f"{'model':<7}{'hidden':>7}{'lr':>8}{'batch':>7}{'full':>6}{'epochs':>8}"
+          f"{'params':>8}{'acc':>7}{'train':>9}{'latency':>11}")
+    for r in sorted(results, key=lambda r: (-r["accuracy"], r["parameters"], r["latency"])):
+        print(f"{r['model_type']:<7}{r['hidden_size']:>7}{r['learning_rate']:>8}"
+              f"{r['batch_size']:>7}{'yes' if r['full_batch'] else 'no':>6}{r['epochs']:>8}"
+              f"{r['parameters']:>8}{r['accuracy']:>7.2f}{r['train_time']:>8.2f}s"
+              f"{r['latency'] * 1e6:>9.1f}µs")
+
+    best = best_config(results, min_accuracy)
+    if best is None:
+        print(f"\n❌ No configuration reached accuracy {min_accuracy:.2f}")
+    else:
+        print(f"\n✅ Smallest/fastest with accuracy >= {min_accuracy:.2f}: "
+              f"{best['model_type']} hidden_size={best['hidden_size']} "
+              f"learning_rate={best['learning_rate']} batch_size={best['batch_size']} "
+              f"full_batch={best['full_batch']} ({best['accuracy']:.2f} accuracy, "
+              f"{best['latency'] * 1e6:.1f}µs/message)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter sweep for the intent model")
+    parser.add_argument("--intents", default="intents.json")
+    parser.add_argument("--hidden-sizes", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--learning-rates", type=float, nargs="+", default=[0.001, 0.005, 0.01])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8])
+    parser.add_argument("--full-batch", choices=["no", "yes", "both"], default="both")
+    parser.add_argument("--models", nargs="+", choices=["dense", "sparse"], default=["dense"])
+    parser.add_argument("--epochs", type=int, default=1000)
+    parser.add_argument("--patience", type=int, default=50)
+    parser.add_argument("--test-fraction", type=float, default=0.25)
+    parser.add_argument("--min-accuracy", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    grid = {
+        "model_type": args.models,
+        "hidden_size": args.hidden_sizes,
+        "learning_rate": args.learning_rates,
+        "batch_size": args.batch_sizes,
+        "full_batch": {"no": [False], "yes": [True], "both": [False, True]}[args.full_batch],
+        "num_epochs": [args.epochs],
+        "patience": [args.patience],
+    }
+
+    start = time.perf_counter()
+    results = sweep(grid, args.intents, args.test_fraction, args.seed, args.workers)
+    print(f"🔬 {len(results)} configurations in {time.perf_counter() - start:.1f}s\n")
+    print_results(results, args.min_accuracy)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script untuk LRU cache dan memoized stemming
+"""
+
+from cache_utils import LRUCache
+from nltk_utils import stem, stem_cache, seed_stem_cache
+
+def test_lru_cache():
+    print("=== Testing LRU cache ===")
+    
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1      # "a" is now most recently used
+    cache.put("c", 3)               # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    
+    stats = cache.stats()
+    print(f"   Stats: {stats}")
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+    assert stats["size"] == 2
+    
+    cache.resize(1)
+    assert len(cache) == 1 and "c" in cache
+    
+    disabled = LRUCache(maxsize=0)
+    disabled.put("a", 1)
+    assert disabled.get("a") is None and len(disabled) == 0
+    print()
+
+def test_stem_cache():
+    print("=== Testing stem cache ===")
+    
+    stem_cache.clear()
+    seed_stem_cache(["organizing", "hello"])
+    assert stem("organizing") == "organ"
+    assert stem("Organizes") == "organ"
+    
+    stats = stem_cache.stats()
+    print(f"   Stats: {stats}")
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    print()
+
+if __name__ == "__main__":
+    test_lru_cache()
+    test_stem_cache()
+    
+    print("✅ All cache tests completed!")
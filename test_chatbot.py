@@ -3,7 +3,18 @@
 Test chatbot dengan fitur PDF dan matematika yang sudah diupgrade
 """
 
-from chat import get_response
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# translations of this run go to a temporary cache, not the shared one
+TRANSLATION_CACHE_DIR = tempfile.TemporaryDirectory()
+os.environ["CHAT_TRANSLATION_CACHE"] = os.path.join(TRANSLATION_CACHE_DIR.name, "translation_cache.db")
+
+import chat
+from chat import get_response, get_responses
 
 def test_chatbot_features():
     print("🤖 Testing Enhanced Chatbot Features")
@@ -43,5 +54,105 @@ def test_chatbot_features():
     
     print("\n✅ All chatbot tests completed!")
 
+def test_batched_responses():
+    print("🤖 Testing Batched Responses")
+    print("="*50)
+    
+    # Deterministic answers so batch and single calls can be compared
+    messages = [
+        "calculate 5 + 3",
+        "some random text",
+        "length=10, width=5",
+        "compute 10 * 2",
+        "side=4",
+    ]
+    
+    batched = get_responses(messages)
+    assert len(batched) == len(messages)
+    for msg, response in zip(messages, batched):
+        print(f"   User: {msg}")
+        print(f"   Bot: {response}")
+        assert response == get_response(msg)
+    
+    print("\n✅ Batched responses match single responses!")
+
+def test_exact_match_fast_path():
+    print("🤖 Testing Exact-Match Fast Path")
+    print("="*50)
+    
+    thanks = next(i for i in chat.get_chat_model().intents['intents'] if i['tag'] == 'thanks')
+    hits = chat.exact_match_stats["hits"]
+    
+    for msg in ["Thanks", "thank's a lot", "  THANK YOU  "]:
+        response = get_response(msg)
+        print(f"   User: {msg}")
+        print(f"   Bot: {response}")
+        assert response in thanks['responses']
+    
+    assert chat.exact_match_stats["hits"] == hits + 3
+    print(f"\n✅ Fast path share of traffic: {chat.exact_match_share():.0%}")
+
+def test_lazy_initialization():
+    print("🤖 Testing Lazy Initialization")
+    print("="*50)
+    
+    # fresh interpreter, this one already loaded everything
+    code = ("import sys, chat\n"
+            "print(chat.get_response('calculate 2 + 3'))\n"
+            "print(sorted(m for m in ('torch', 'nltk', 'fitz', 'googletrans') if m in sys.modules))\n"
+            "print(chat.chat_model is None)")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                            text=True, check=True).stdout.strip().splitlines()
+    print(f"   calculate 2 + 3 -> {output[-3]}")
+    assert "5" in output[-3]
+    assert output[-2] == "[]", f"loaded at import: {output[-2]}"
+    assert output[-1] == "True"
+    
+    assert chat.get_chat_model() is chat.init()
+    print("\n✅ Routed messages don't load torch, nltk, PyMuPDF or googletrans!")
+
+def test_engines_reload_model_file():
+    print("🤖 Testing Engines and Hot Reload")
+    print("="*50)
+    
+    from export_model import export_serving_model
+    
+    artifact_file, serving_file = chat.FILE, chat.SERVING_FILE
+    engine = chat.ENGINE
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chat.FILE = os.path.join(tmp_dir, "data.bin")
+        chat.SERVING_FILE = os.path.join(tmp_dir, "data_serving.pt")
+        shutil.copy(artifact_file, chat.FILE)
+        # the torchscript engine serves the parity checked export
+        export_serving_model(output_file=chat.SERVING_FILE, verbose=False)
+        try:
+            for name, served in (("torch", chat.FILE), ("torchscript", chat.SERVING_FILE),
+                                 ("numpy", chat.FILE)):
+                chat.init(name)
+                chat.reload_model(force=True)  # from the copies
+                current = chat.chat_model
+                assert chat.model_file() == served
+                response = get_response("Hi")
+                print(f"   {name}: {os.path.basename(served)}, Hi -> {response}")
+                assert not chat.reload_model()
+                
+                # train.py / export_model.py replace the file, the engine picks it up
+                shutil.copy(served, served + ".new")
+                os.replace(served + ".new", served)
+                assert chat.reload_model()
+                assert chat.chat_model is not current
+                assert get_response("Hi") in {r for i in current.intents["intents"] if i["tag"] == "greeting"
+                                              for r in i["responses"]}
+        finally:
+            chat.FILE, chat.SERVING_FILE = artifact_file, serving_file
+            chat.init(engine)
+            chat.reload_model(force=True)
+    
+    print("\n✅ Every engine serves and hot-reloads its model file!")
+
 if __name__ == "__main__":
     test_chatbot_features()
+    test_batched_responses()
+    test_exact_match_fast_path()
+    test_lazy_initialization()
+    test_engines_reload_model_file()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script untuk export model CPU serving (convert_model dan load_serving_model)
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+import torch
+
+from export_model import META_FILE, convert_model, load_serving_model, model_inputs
+from model import build_model
+from nltk_utils import SparseBagMatrix
+
+def random_bags(rng, rows, input_size):
+    dense = rng.random((rows, input_size)) < 0.1
+    indptr = np.concatenate([[0], np.cumsum(dense.sum(axis=1))])
+    return SparseBagMatrix(indptr, np.flatnonzero(dense) % input_size, input_size)
+
+def test_serving_roundtrip():
+    print("=== Testing convert_model -> load_serving_model ===")
+
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    input_size, hidden_size, output_size = 120, 8, 11
+    bags = random_bags(rng, 64, input_size)
+
+    for model_type in ["dense", "sparse"]:
+        eager = build_model(model_type, input_size, hidden_size, output_size)
+        eager.eval()
+        inputs = model_inputs(bags, model_type)
+
+        for quantize in [False, True]:
+            converted = convert_model(eager, quantize=quantize)
+            meta = {"model_type": model_type, "tags": [f"tag{i}" for i in range(output_size)],
+                    "quantized": quantize}
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                serving_file = os.path.join(tmp_dir, "data_serving.pt")
+                torch.jit.save(converted, serving_file, _extra_files={META_FILE: json.dumps(meta)})
+                loaded, loaded_meta = load_serving_model(serving_file)
+
+            with torch.no_grad():
+                expected = eager(*inputs)
+                converted_output = converted(*inputs)
+                loaded_output = loaded(*inputs)
+
+            # the saved module is the converted one, same predictions and logits
+            assert loaded_meta == meta
+            assert torch.equal(loaded_output, converted_output)
+            assert torch.equal(loaded_output.argmax(dim=1), converted_output.argmax(dim=1))
+            if not quantize:
+                assert torch.allclose(loaded_output, expected, atol=1e-5)
+            agreement = (loaded_output.argmax(dim=1) == expected.argmax(dim=1)).float().mean().item()
+            print(f"   {model_type} quantize={quantize}: {agreement:.0%} same predictions as eager")
+    print()
+
+if __name__ == "__main__":
+    test_serving_roundtrip()
+
+    print("✅ All serving export tests completed!")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test script untuk compiled expression cache di MathExpressionEvaluator
+"""
+
+import time
+
+import numpy as np
+
+from math_utils import MathExpressionEvaluator, build_grid, parse_user_math_input
+
+def test_compiled_expressions():
+    print("=== Testing compiled expressions ===")
+
+    cases = [
+        ("2 + 3 * 4", None, 14),
+        ("(2 + 3) * 4", None, 20),
+        ("2 ** 3 ** 2", None, 512),
+        ("-x ** 2 + y", {"x": 3, "y": 1}, -8),
+        ("(-x) ** 2", {"x": 3}, 9),
+        ("sqrt(a * a + b * b)", {"a": 3, "b": 4}, 5.0),
+        ("length * width", {"length": 2.5, "width": 4}, 10.0),
+    ]
+    for expr, variables, expected in cases:
+        result = MathExpressionEvaluator.eval_expression(expr, variables)
+        print(f"   {expr} {variables or ''} = {result}")
+        assert result == expected, f"{expr}: {result} != {expected}"
+
+    for expr, variables in [("1 / (x - 1)", {"x": 1}), ("a + b", {"a": 1}),
+                            ("__import__('os')", None), ("2 +", None)]:
+        result = MathExpressionEvaluator.eval_expression(expr, variables)
+        print(f"   {expr} {variables or ''} -> {result}")
+        assert result.startswith("Error evaluating expression")
+
+    print("✅ Compiled expressions evaluate like before")
+
+def test_function_calls():
+    print("=== Testing function calls ===")
+
+    cases = [
+        ("sqrt((a + b) * c)", {"a": 1, "b": 3, "c": 4}, 4.0),
+        ("sqrt(sqrt(16)) + abs(-2)", None, 4.0),
+        ("2 * pi * r", {"r": 1}, 2 * 3.141592653589793),
+        ("log(e ** 2)", None, 2.0),
+        ("log(8, 2) + max(1, x, 3)", {"x": 5}, 8.0),
+        ("e * 2", {"e": 5}, 10),  # a binding wins over the constant
+    ]
+    for expr, variables, expected in cases:
+        result = MathExpressionEvaluator.eval_expression(expr, variables)
+        print(f"   {expr} {variables or ''} = {result}")
+        assert abs(result - expected) < 1e-9, f"{expr}: {result} != {expected}"
+
+    assert MathExpressionEvaluator.compile("hypot(a, b) * pi + sin(t)").names == {"a", "b", "t"}
+    for expr in ["open('x')", "sqrt(x=4)", "sqrt(-1)", "(lambda: 1)()"]:
+        result = MathExpressionEvaluator.eval_expression(expr)
+        print(f"   {expr} -> {result}")
+        assert result.startswith("Error evaluating expression")
+
+    x = np.linspace(0, 2 * np.pi, 50)
+    values = MathExpressionEvaluator.eval_vectorized("sqrt(sin(x) ** 2 + cos(x) ** 2) + log(x + 2, x + 2) - 1", {"x": x})
+    assert np.allclose(values, 1.0)
+
+    print("✅ Function calls and constants are evaluated natively")
+
+def test_cost_limits():
+    print("=== Testing cost limits ===")
+
+    pathological = [
+        "9**9**9",
+        "(10**3000) * (10**3000)",
+        "2.0 ** 100000",
+        "1" * 600,
+        "-" * 150 + "1",
+        "+".join(["(x*x)"] * 80),
+        "'a' * 10",
+        "2**10000",
+        "10**300*1.0**2",
+        "1e308*10",
+        "1e308*10 - 1e308*10",
+    ]
+    for expr in pathological:
+        start = time.perf_counter()
+        result = MathExpressionEvaluator.eval_expression(expr, {"x": 1})
+        elapsed = time.perf_counter() - start
+        print(f"   {expr[:30]} -> {result} ({elapsed * 1000:.2f}ms)")
+        assert result.startswith("Error evaluating expression")
+        # generous, only catches evaluations that actually run away
+        assert elapsed < 5
+
+    assert MathExpressionEvaluator.eval_expression("2**10000") == \
+        "Error evaluating expression: Result would have about 3,010 digits, the limit is 100"
+    assert MathExpressionEvaluator.eval_expression("1e308*10") == \
+        "Error evaluating expression: Result is not a finite number"
+    assert MathExpressionEvaluator.eval_expression("10**300*1.0**2").endswith("the limit is 100")
+    assert MathExpressionEvaluator.eval_expression("1e150 * 2") == \
+        "Error evaluating expression: Result has more than 100 digits, the limit is 100"
+
+    # big but bounded results still work
+    assert MathExpressionEvaluator.eval_expression("2 ** 300") == 2 ** 300
+    assert MathExpressionEvaluator.eval_expression("(10**40) * (10**50)") == 10 ** 90
+    assert MathExpressionEvaluator.eval_expression("1e99 * 9") == 9e99
+
+    result = MathExpressionEvaluator.eval_expression("sqrt(x) * 2", {"x": 4}, timeout=0)
+    assert result == "Error evaluating expression: Evaluation took too long"
+    assert MathExpressionEvaluator.eval_expression("sqrt(x) * 2", {"x": 4}, timeout=1) == 4.0
+
+    print("✅ Pathological expressions fail fast")
+
+def test_expression_cache():
+    print("=== Testing expression cache ===")
+
+    cache = MathExpressionEvaluator.compiled_cache
+    cache.clear()
+
+    compiled = MathExpressionEvaluator.compile("a * x ** 2 + b")
+    assert compiled.names == {"a", "x", "b"}
+    # runs of whitespace are collapsed, other spacing is part of the key
+    assert MathExpressionEvaluator.compile("  a*x ** 2 +   b ") is not compiled
+    assert MathExpressionEvaluator.compile("a * x ** 2  + b") is compiled
+    assert cache.stats()["hits"] == 1
+
+    values = [compiled({"a": 2, "x": x, "b": 1}) for x in range(5)]
+    assert values == [1, 3, 9, 19, 33]
+
+    start = time.perf_counter()
+    for x in range(10000):
+        MathExpressionEvaluator.eval_expression("a * x ** 2 + b", {"a": 2, "x": x, "b": 1})
+    elapsed = time.perf_counter() - start
+    print(f"   10000 evaluations with new bindings: {elapsed * 1000:.1f}ms")
+    print(f"   Cache stats: {cache.stats()}")
+
+    print("✅ Expressions are parsed once and reused")
+
+def test_vectorized_evaluation():
+    print("=== Testing vectorized evaluation ===")
+
+    parsed = parse_user_math_input("calculate a*x**2 + b for x=0..10 step 0.5, a=2, b=1")
+    assert parsed["type"] == "range_evaluation"
+    assert parsed["ranges"] == {"x": (0.0, 10.0, 0.5)}
+    assert parsed["variables"] == {"a": 2.0, "b": 1.0}
+    assert parsed["expression"] == "a*x**2 + b"
+
+    grid = build_grid({"x": (0, 10, 0.5), "y": (1, 3, 1)})
+    assert len(grid["x"]) == 21 * 3
+    bindings = {**grid, "a": 2.0}
+    values = MathExpressionEvaluator.eval_vectorized("a * x ** 2 / y", bindings)
+    expected = [MathExpressionEvaluator.eval_expression("a * x ** 2 / y", {"x": x, "y": y, "a": 2.0})
+                for x, y in zip(grid["x"], grid["y"])]
+    assert np.allclose(values, expected)
+
+    # a zero denominator marks that element only
+    values = MathExpressionEvaluator.eval_vectorized("1 / (x - 2)", build_grid({"x": (0, 4, 1)}))
+    assert np.isinf(values[2]) and np.isfinite(values[[0, 1, 3, 4]]).all()
+
+    try:
+        build_grid({"x": (0, 1000, 0.001)})
+        assert False, "grid limit not enforced"
+    except ValueError as e:
+        print(f"   {e}")
+
+    x = build_grid({"x": (0, 99.999, 0.001)})["x"]
+    start = time.perf_counter()
+    MathExpressionEvaluator.eval_vectorized("3 * x ** 2 + 2 * x + 1", {"x": x})
+    vectorized = time.perf_counter() - start
+    start = time.perf_counter()
+    for value in x[:10000]:
+        MathExpressionEvaluator.eval_expression("3 * x ** 2 + 2 * x + 1", {"x": value})
+    per_call = (time.perf_counter() - start) * len(x) / 10000
+    print(f"   {len(x)} values: {vectorized * 1000:.1f}ms vectorized, ~{per_call * 1000:.0f}ms one call each")
+
+    print("✅ Vectorized evaluation matches scalar evaluation")
+
+if __name__ == "__main__":
+    test_compiled_expressions()
+    test_function_calls()
+    test_cost_limits()
+    test_expression_cache()
+    test_vectorized_evaluation()
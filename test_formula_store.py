@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script untuk formula store dari rumus hasil ekstraksi PDF
+"""
+
+import os
+import tempfile
+import time
+
+# translations of this run go to a temporary cache, not the shared one
+TRANSLATION_CACHE_DIR = tempfile.TemporaryDirectory()
+os.environ["CHAT_TRANSLATION_CACHE"] = os.path.join(TRANSLATION_CACHE_DIR.name, "translation_cache.db")
+
+import chat
+from formula_store import FormulaStore, find_store, remember_store, session_scope
+from math_utils import calculate_math_expression, extract_math_formulas
+
+SAMPLE_TEXT = ("Luas = panjang * lebar\n"
+               "Keliling = 2 * (panjang + lebar)\n"
+               "Segitiga = (alas * tinggi) / 2\n"
+               "Persegi = sisi**2")
+
+def test_extracted_formulas():
+    print("=== Testing extracted formulas ===")
+    
+    formulas = extract_math_formulas(SAMPLE_TEXT)
+    store = FormulaStore("sample").add_extracted(formulas)
+    print(f"   {len(store)} formulas stored, {len(store.skipped)} skipped")
+    assert len(store) == len(formulas)
+    
+    cases = [
+        ("luas", {"panjang": 10, "lebar": 5}, 50.0),
+        ("Keliling", {"length": 10, "width": 5}, 30.0),
+        ("segitiga", {"alas": 3, "tinggi": 4}, 6.0),
+        ("triangle", {"base": 3, "height": 4}, 6.0),
+        ("persegi", {"sisi": 3}, 9.0),
+    ]
+    for name, values, expected in cases:
+        formula, value = store.evaluate(name, values)
+        print(f"   {name} {values} -> {formula.name} = {formula.expression} = {value}")
+        assert value == expected
+    
+    try:
+        store.evaluate("luas", {"panjang": 10})
+        assert False, "missing value not reported"
+    except ValueError as e:
+        assert str(e) == "Missing values for: width"
+    assert store.get("volume") is None
+    
+    # calculate_math_expression takes the extractor's dicts
+    for formula in formulas:
+        print(f"   {calculate_math_expression(formula, {'panjang': 10, 'lebar': 5, 'alas': 3, 'tinggi': 4, 'sisi': 3})}")
+    assert calculate_math_expression(formulas[0], {"panjang": 10, "lebar": 5}) == "luas = 10.0 * 5.0 = 50.0000"
+    assert calculate_math_expression(formulas[0], {}) == "Missing values for: length, width"
+    
+    print("✅ Extracted formulas are compiled and evaluated")
+
+def test_large_store():
+    print("=== Testing a store with many formulas ===")
+    
+    text = "\n".join(f"Rumus{i} = panjang * {i} + lebar" for i in range(500))
+    start = time.perf_counter()
+    store = FormulaStore("large").add_extracted(extract_math_formulas(text))
+    built = time.perf_counter() - start
+    assert len(store) == 500
+    
+    start = time.perf_counter()
+    for i in range(500):
+        formula, value = store.evaluate(f"rumus{i}", {"panjang": 2, "lebar": 1})
+        assert value == 2 * i + 1
+    queried = time.perf_counter() - start
+    print(f"   500 formulas: stored in {built * 1000:.1f}ms, 500 evaluations in {queried * 1000:.1f}ms")
+    
+    print("✅ Lookups stay fast with many formulas")
+
+def test_session_stores():
+    print("=== Testing formula stores per session ===")
+    
+    store = FormulaStore("alice.pdf").add_extracted(extract_math_formulas(SAMPLE_TEXT))
+    with session_scope("alice"):
+        remember_store("alice.pdf", store)
+        assert find_store() is store
+    with session_scope("bob"):
+        assert find_store() is None
+    assert find_store("alice.pdf") is store
+    
+    alice = chat.get_response("evaluate luas with panjang=2, lebar=3", session="alice")
+    bob = chat.get_response("evaluate luas with panjang=2, lebar=3", session="bob")
+    print(f"   alice -> {alice.splitlines()[-1]}")
+    print(f"   bob -> {bob}")
+    assert alice.endswith("• Result = 6.0000")
+    assert bob.startswith("❌ No formula named 'luas'. Process a PDF first")
+    
+    # every evaluation error is an answer, not an exception out of get_response
+    store = FormulaStore("errors.pdf")
+    store.add("y", "exp(x)")
+    store.add("z", "sqrt(x, w)")
+    store.add("v", "x * 2")
+    with session_scope("carol"):
+        remember_store("errors.pdf", store)
+    for message, expected in [
+        ("evaluate y with x=1000", "❌ Error evaluating expression: math range error"),
+        ("evaluate z with x=4, w=2", "❌ Error evaluating expression: "),
+        ("evaluate v with x=1e200", "❌ Error evaluating expression: Result has more than 100 digits"),
+        ("evaluate v with x=1.5e2", "• Result = 300.0000"),
+        # not a number, not read as x=1.5
+        ("evaluate v with x=1.5.3", "❌ Missing values for: x"),
+    ]:
+        response = chat.get_response(message, session="carol")
+        print(f"   {message} -> {response.splitlines()[-1]}")
+        assert expected in response, response
+    
+    # "evaluate ... with" needs name=value after it to be a formula evaluation
+    assert chat.router.match("evaluate this with care") is None
+    assert chat.router.match("evaluate x**2 + y with x=3, y=1").name == "formula_evaluation"
+    assert chat.get_response("evaluate x**2 + y with x=3, y=1") == \
+        "🧮 **Complex Calculation:** x**2 + y = 10.0000"
+    
+    print("✅ Each session evaluates its own documents")
+
+if __name__ == "__main__":
+    test_extracted_formulas()
+    test_large_store()
+    test_session_stores()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script untuk geometry shape registry
+"""
+
+import math
+
+from chat import handle_math_calculation
+from geometry import find_shape, register_shape, unregister_shape
+
+def legacy_geometry(variables):
+    """the if-chain chat.handle_math_calculation used before the registry"""
+    if 'length' in variables and 'width' in variables:
+        area = variables['length'] * variables['width']
+        perimeter = 2 * (variables['length'] + variables['width'])
+        return (f"📐 **Rectangle Calculations:**\n"
+               f"• Length = {variables['length']}\n"
+               f"• Width = {variables['width']}\n"
+               f"• Area = {area:.4f}\n"
+               f"• Perimeter = {perimeter:.4f}")
+    elif 'side' in variables:
+        area = variables['side'] ** 2
+        perimeter = 4 * variables['side']
+        return (f"🔲 **Square Calculations:**\n"
+               f"• Side = {variables['side']}\n"
+               f"• Area = {area:.4f}\n"
+               f"• Perimeter = {perimeter:.4f}")
+    elif 'radius' in variables:
+        area = math.pi * (variables['radius'] ** 2)
+        circumference = 2 * math.pi * variables['radius']
+        return (f"⭕ **Circle Calculations:**\n"
+               f"• Radius = {variables['radius']}\n"
+               f"• Area = π × {variables['radius']}² = {area:.4f}\n"
+               f"• Circumference = 2π × {variables['radius']} = {circumference:.4f}")
+    elif 'base' in variables and 'height' in variables:
+        area = 0.5 * variables['base'] * variables['height']
+        return (f"🔺 **Triangle Area:**\n"
+               f"• Base = {variables['base']}\n"
+               f"• Height = {variables['height']}\n"
+               f"• Area = ½ × {variables['base']} × {variables['height']} = {area:.4f}")
+
+def test_legacy_shapes():
+    print("=== Testing legacy shapes ===")
+
+    messages = [
+        "length=10, width=5",
+        "length=2.5 width=0.3",
+        "side=4",
+        "radius=3",
+        "radius=0.1",
+        "base=6, height=4",
+        "length=10, width=5, side=2",  # extra variables: first shape of the old chain
+        "side=3, radius=2",
+    ]
+    for msg in messages:
+        response = handle_math_calculation(msg)
+        variables = {name: float(value) for name, value in
+                     (pair.split("=") for pair in msg.replace(",", " ").split())}
+        print(f"   {msg} -> {response.splitlines()[0]}")
+        assert response == legacy_geometry(variables), response
+
+    print("✅ Registry answers like the old if-chain")
+
+def test_new_shapes():
+    print("=== Testing new shapes ===")
+
+    cases = [
+        ("radius=1, height=3", "cylinder", "volume", math.pi * 3),
+        ("cone radius=1, height=3", "cone", "volume", math.pi),
+        ("sphere radius=2", "sphere", "volume", 4 / 3 * math.pi * 8),
+        ("cube side=2", "cube", "surface_area", 24.0),
+        ("base1=2, base2=4, height=3", "trapezoid", "area", 9.0),
+    ]
+    for msg, name, result, expected in cases:
+        variables = {name_: float(value) for name_, value in
+                     (pair.split("=") for pair in msg.replace(",", " ").split() if "=" in pair)}
+        shape = find_shape(variables, msg)
+        assert shape.name == name, f"{msg}: {shape.name}"
+        assert abs(shape.evaluate(variables)[result] - expected) < 1e-9
+        response = handle_math_calculation(msg)
+        print(f"   {msg} -> {response.splitlines()[0]}")
+        assert name.capitalize() in response
+
+    # named shape needs all its variables, otherwise the variables decide
+    assert find_shape({"radius": 1.0}, "cylinder radius=1").name == "circle"
+    assert find_shape({"width": 1.0}) is None
+
+    register_shape("ellipse", ["semi_major", "semi_minor"],
+                   {"area": "pi * semi_major * semi_minor"},
+                   "⬭ **Ellipse Area:** {area:.4f}")
+    try:
+        assert handle_math_calculation("semi_major=2, semi_minor=1") == f"⬭ **Ellipse Area:** {2 * math.pi:.4f}"
+        assert "Ellipse: semi_major + semi_minor" in handle_math_calculation("x=1")
+        assert "Ellipse: semi_major + semi_minor" in handle_math_calculation("x=1..3")
+    finally:
+        unregister_shape("ellipse")
+
+    print("✅ New shapes are dispatched by their variables or their name")
+
+if __name__ == "__main__":
+    test_legacy_shapes()
+    test_new_shapes()
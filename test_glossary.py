@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script untuk compiled glossary (glossary.py / glossary.json)
+"""
+
+import json
+import os
+import random
+import re
+import tempfile
+import time
+
+from glossary import Glossary, get_glossary, load_glossary
+from math_utils import extract_math_formulas, translate_single_line
+
+# The per-term loops before glossary.json, the golden reference
+LEGACY_MATH_TERMS = {
+    'persegi panjang': 'rectangle', 'persegi': 'square', 'segitiga': 'triangle',
+    'lingkaran': 'circle', 'panjang': 'length', 'lebar': 'width', 'sisi': 'side',
+    'alas': 'base', 'tinggi': 'height', 'jari-jari': 'radius',
+    'mencari akar': 'square root', 'akar kuadrat': 'square root', 'akar': 'root',
+    'luas': 'area', 'keliling': 'perimeter'
+}
+LEGACY_TERM_MAPPINGS = {
+    'persegi panjang': 'rectangle', 'persegi': 'square', 'segitiga': 'triangle',
+    'panjang': 'length', 'lebar': 'width', 'sisi': 'side', 'alas': 'base',
+    'tinggi': 'height', 'mencari akar': 'square_root'
+}
+
+def legacy_translate_single_line(line):
+    translated = line.lower()
+    for indonesian, english in LEGACY_MATH_TERMS.items():
+        pattern = r'\b' + re.escape(indonesian) + r'\b'
+        translated = re.sub(pattern, english, translated, flags=re.IGNORECASE)
+    translated = re.sub(r'\s*\*\*\s*', '**', translated)
+    translated = re.sub(r'\s*\*\s*', ' * ', translated)
+    translated = re.sub(r'\s*=\s*', ' = ', translated)
+    translated = re.sub(r'\s*/\s*', ' / ', translated)
+    translated = re.sub(r'\s*\+\s*', ' + ', translated)
+    translated = re.sub(r'\s*-\s*', ' - ', translated)
+    translated = re.sub(r'\s*\(\s*', '(', translated)
+    translated = re.sub(r'\s*\)\s*', ')', translated)
+    translated = re.sub(r'\s{2,}', ' ', translated)
+    return translated.strip()
+
+def legacy_analysis(line):
+    for indonesian, english in LEGACY_TERM_MAPPINGS.items():
+        line = line.replace(indonesian, english)
+    return line
+
+def test_same_translations():
+    print("=== Testing glossary translations ===")
+
+    lines = [
+        "Luas Persegi Panjang = Panjang * lebar",
+        "Keliling lingkaran = 2 * pi * jari-jari",
+        "Mencari akar kuadrat = √x, akar 2, akarnya",
+        "persegipanjang = sisi**2 + alas*tinggi / 2",
+        "Segitiga = (alas * tinggi) / 2",
+    ]
+    for line in lines:
+        assert translate_single_line(line) == legacy_translate_single_line(line), line
+        assert get_glossary('analysis').translate(line.lower()) == legacy_analysis(line.lower()), line
+    print(f"   {lines[0]!r} -> {translate_single_line(lines[0])!r}")
+
+    words = list(LEGACY_MATH_TERMS) + ['x', '2', ' ', '  ', '-', '=', '*', '(', ')', 'nya', 'Pers']
+    rng = random.Random(0)
+    for _ in range(3000):
+        line = ''.join(rng.choice(words) + rng.choice(['', ' ']) for _ in range(rng.randint(1, 12)))
+        assert translate_single_line(line) == legacy_translate_single_line(line), line
+        assert get_glossary('analysis').translate(line.lower()) == legacy_analysis(line.lower()), line
+
+    formulas = extract_math_formulas("Persegi Panjang = Panjang * lebar\nSegitiga = (alas * tinggi) / 2")
+    assert [formula['type'] for formula in formulas] == ['rectangle', 'triangle']
+
+    print("✅ One pass translations match the per-term loops")
+
+def test_glossary_file():
+    print("=== Testing glossary file ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "glossary.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"translation": {"whole_words": True,
+                                       "terms": {"Kubus": "cube", "rusuk": "edge", "kubus kecil": "small cube"}}}, f)
+        glossary = load_glossary(path)["translation"]
+
+    assert glossary.translate("volume kubus kecil = rusuk**3") == "volume small cube = edge**3"
+    assert glossary.translate("kubusnya rusuk") == "kubusnya edge"
+    assert Glossary({}).translate("luas") == "luas"
+
+    print("✅ Glossary files are compiled with their matching mode")
+
+def test_flat_cost():
+    print("=== Testing cost with a large glossary ===")
+
+    rng = random.Random(1)
+    syllables = ["ka", "la", "ma", "na", "pa", "ra", "sa", "ta", "ng", "ri", "lu", "be"]
+    large_terms = dict(LEGACY_MATH_TERMS)
+    while len(large_terms) < 2000:
+        term = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 5)))
+        large_terms.setdefault(term, term.upper())
+
+    line = "luas persegi panjang = panjang * lebar, keliling lingkaran = 2 * pi * jari - jari " * 4
+    timings = {}
+    for name, terms in [("15 terms", LEGACY_MATH_TERMS), ("2000 terms", large_terms)]:
+        glossary = Glossary(terms, whole_words=True)
+        start = time.perf_counter()
+        for _ in range(2000):
+            glossary.translate(line)
+        timings[name] = time.perf_counter() - start
+        print(f"   {name}: {timings[name] / 2000 * 1e6:.1f}µs per line")
+
+    assert Glossary(large_terms, whole_words=True).translate(line) == Glossary(LEGACY_MATH_TERMS, whole_words=True).translate(line)
+    assert timings["2000 terms"] < timings["15 terms"] * 3
+
+    print("✅ Translation cost stays flat as the glossary grows")
+
+if __name__ == "__main__":
+    test_same_translations()
+    test_glossary_file()
+    test_flat_cost()
@@ -3,6 +3,13 @@
 Test script untuk fitur matematika dan terjemahan PDF chatbot
 """
 
+import os
+import tempfile
+
+# translations of this run go to a temporary cache, not the shared one
+TRANSLATION_CACHE_DIR = tempfile.TemporaryDirectory()
+os.environ["CHAT_TRANSLATION_CACHE"] = os.path.join(TRANSLATION_CACHE_DIR.name, "translation_cache.db")
+
 from math_utils import (
     translate_indonesian_to_english,
     extract_math_formulas, 
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script untuk NumPy inference engine (parity dengan model.NeuralNet)
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import torch
+
+from model import NeuralNet, SparseNeuralNet
+from nltk_utils import SparseBagMatrix
+from model_artifact import read_artifact, write_artifact
+from numpy_model import NumpyNeuralNet, dense_model_state, export_weights, load_weights, softmax
+
+def test_forward_parity():
+    print("=== Testing NumPy forward parity ===")
+    
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    
+    for input_size, hidden_size, output_size in [(5, 3, 2), (54, 8, 7), (300, 16, 40)]:
+        model = NeuralNet(input_size, hidden_size, output_size)
+        model.eval()
+        numpy_model = NumpyNeuralNet({
+            name: tensor.numpy() for name, tensor in model.state_dict().items()
+        })
+        
+        # bag of words inputs are 0/1 float32 rows
+        X = (rng.random((16, input_size)) < 0.1).astype(np.float32)
+        with torch.no_grad():
+            expected = model(torch.from_numpy(X))
+        
+        output = numpy_model(X)
+        assert np.allclose(output, expected.numpy(), atol=1e-5)
+        assert np.allclose(softmax(output), torch.softmax(expected, dim=1).numpy(), atol=1e-6)
+        print(f"   {input_size}x{hidden_size}x{output_size}: OK")
+    print()
+
+def test_export_roundtrip():
+    print("=== Testing export of data.pth ===")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        artifact_file = os.path.join(tmp_dir, "data.bin")
+        export_weights("data.pth", artifact_file)
+        exported = load_weights(artifact_file)
+    
+    data = torch.load("data.pth")
+    assert exported["all_words"] == data["all_words"]
+    assert exported["tags"] == data["tags"]
+    
+    model = NeuralNet(data["input_size"], data["hidden_size"], data["output_size"])
+    model.load_state_dict(data["model_state"])
+    model.eval()
+    
+    X = np.eye(data["input_size"], dtype=np.float32)
+    with torch.no_grad():
+        expected = model(torch.from_numpy(X)).numpy()
+    output = exported["model"](X)
+    assert np.allclose(output, expected, atol=1e-5)
+    assert (output.argmax(axis=1) == expected.argmax(axis=1)).all()
+    print(f"   {len(exported['tags'])} tags, {len(exported['all_words'])} words: OK\n")
+
+def test_sparse_model_parity():
+    print("=== Testing EmbeddingBag model parity ===")
+    
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    input_size, hidden_size, output_size = 200, 8, 11
+    
+    sparse_model = SparseNeuralNet(input_size, hidden_size, output_size)
+    sparse_model.eval()
+    
+    # the same weights in the dense NeuralNet layout
+    state = dense_model_state(sparse_model.state_dict(), "sparse")
+    dense_model = NeuralNet(input_size, hidden_size, output_size)
+    dense_model.load_state_dict({name: torch.from_numpy(array) for name, array in state.items()})
+    dense_model.eval()
+    numpy_model = NumpyNeuralNet(state)
+    
+    # random rows with a handful of active words, including an empty row
+    rows = [sorted(rng.choice(input_size, size=k, replace=False)) for k in [3, 0, 6, 1]]
+    indptr = np.cumsum([0] + [len(r) for r in rows])
+    bags = SparseBagMatrix(indptr, np.concatenate(rows), input_size)
+    
+    with torch.no_grad():
+        sparse_output = sparse_model(*bags.to_bag_inputs()).numpy()
+        dense_output = dense_model(torch.from_numpy(bags.to_dense())).numpy()
+    
+    assert np.allclose(sparse_output, dense_output, atol=1e-5)
+    assert np.allclose(numpy_model.forward_sparse(bags), dense_output, atol=1e-5)
+    assert np.allclose(numpy_model(bags.to_dense()), dense_output, atol=1e-5)
+    print("   EmbeddingBag == Linear == NumPy: OK\n")
+
+def test_model_artifact():
+    print("=== Testing memory-mapped model artifact ===")
+    
+    arrays = {
+        "weight": np.arange(12, dtype=np.float32).reshape(3, 4),
+        "bias": np.array([1.5, -2.0], dtype=np.float32),
+        "empty": np.zeros((0, 5), dtype=np.float32),
+    }
+    meta = {"tags": ["greeting", "goodbye"], "model_version": "abc"}
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "model.bin")
+        write_artifact(path, arrays, meta)
+        loaded, loaded_meta = read_artifact(path)
+        
+        assert loaded_meta == meta
+        for name, array in arrays.items():
+            assert loaded[name].shape == array.shape
+            assert (loaded[name] == array).all()
+        # views of the mapped file, not copies
+        base = loaded["weight"]
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert base is not None
+        assert not loaded["weight"].flags.writeable
+        
+        # rewriting replaces the file in one rename, nothing left behind
+        write_artifact(path, {"weight": arrays["weight"] * 2}, meta)
+        assert os.listdir(tmp_dir) == ["model.bin"]
+        assert (read_artifact(path, mmap=False)[0]["weight"] == arrays["weight"] * 2).all()
+    print("   OK\n")
+
+if __name__ == "__main__":
+    test_forward_parity()
+    test_export_roundtrip()
+    test_sparse_model_parity()
+    test_model_artifact()
+    
+    print("✅ All NumPy engine tests completed!")
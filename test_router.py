@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script untuk compiled message router
+"""
+
+from router import MessageRouter
+
+def test_router_priority():
+    print("=== Testing route priority ===")
+    
+    router = MessageRouter()
+    router.add_route("assignment", lambda msg: "assignment", pattern=r'\w+\s*=\s*\d+')
+    router.add_route("pdf", lambda msg: "pdf", keywords=["extract pdf", "pdf math"])
+    router.add_route("calc", lambda msg: "calc", keywords=["calculate", "what is"])
+    
+    test_cases = [
+        ("calculate x=3", "assignment"),        # higher priority matches later
+        ("what is in extract pdf", "pdf"),
+        ("Extract PDF test.pdf", "pdf"),
+        ("CALCULATE 2 + 3", "calc"),
+        ("extract pdf math", "pdf"),
+        ("hello there", None),
+    ]
+    
+    for message, expected in test_cases:
+        result = router.dispatch(message)
+        print(f"   '{message}' -> {result}")
+        assert result == expected
+    print()
+
+def test_router_add_route():
+    print("=== Testing route registration ===")
+    
+    router = MessageRouter()
+    router.add_route("calc", lambda msg: "calc", keywords=["calculate"])
+    assert router.dispatch("evaluate area") is None
+    
+    router.add_route("evaluate", lambda msg: "evaluate", pattern=r'\bevaluate\b', priority=0)
+    assert router.dispatch("evaluate area, calculate") == "evaluate"
+    
+    router.remove_route("evaluate")
+    assert router.dispatch("evaluate area, calculate") == "calc"
+    
+    # groups of a route work inside the combined matcher, numbered
+    # backreferences and reserved group names are rejected
+    router.add_route("twice", lambda msg: "twice", pattern=r'\b(?P<word>\w+) (?P=word)\b', priority=0)
+    assert router.dispatch("calculate calculate") == "twice"
+    router.add_route("escaped", lambda msg: "escaped", pattern=r'\\1')
+    # so are global flags, which only compile at the start of a pattern
+    routes = router.routes
+    for pattern in [r'(\w+) \1', r'(a)?(?(1)b|c)', r'(?P<r0>\d+)', r'(?i)hello']:
+        try:
+            router.add_route("bad", lambda msg: "bad", pattern=pattern)
+            assert False, f"{pattern} accepted"
+        except ValueError as e:
+            print(f"   {pattern}: {e}")
+        # the other routes keep working
+        assert router.routes == routes
+        assert router.dispatch("calculate calculate") == "twice"
+        assert router.dispatch("calculate 2") == "calc"
+    # a scoped flag is fine
+    router.add_route("hello", lambda msg: "hello", pattern=r'(?i:hello)')
+    assert router.dispatch("hello") == "hello"
+    print("   OK\n")
+
+if __name__ == "__main__":
+    test_router_priority()
+    test_router_add_route()
+    
+    print("✅ All router tests completed!")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script untuk hyperparameter sweep (split stratified dan pilihan konfigurasi terbaik)
+"""
+
+from sweep import best_config, split_patterns
+
+def test_split_patterns():
+    print("=== Testing stratified split ===")
+
+    sizes = {"single": 1, "pair": 2, "small": 3, "medium": 8, "large": 20}
+    xy = [([f"{tag}{i}"], tag) for tag, n in sizes.items() for i in range(n)]
+
+    for test_fraction in [0.25, 0.5, 0.9]:
+        train_xy, test_xy = split_patterns(xy, test_fraction, seed=1)
+        # every pattern lands in exactly one split
+        assert sorted(train_xy + test_xy) == sorted(xy)
+        for tag, n in sizes.items():
+            n_train = sum(1 for _, t in train_xy if t == tag)
+            n_test = sum(1 for _, t in test_xy if t == tag)
+            assert n_train >= 1, f"{tag} has no training pattern"
+            assert n_test == min(round(n * test_fraction), n - 1)
+        print(f"   test_fraction {test_fraction}: {len(train_xy)} train, {len(test_xy)} test")
+
+    # same seed, same split
+    assert split_patterns(xy, 0.25, seed=3) == split_patterns(xy, 0.25, seed=3)
+    assert split_patterns(xy, 0.25, seed=3) != split_patterns(xy, 0.25, seed=4)
+    print("✅ Every tag keeps a training pattern")
+
+def test_best_config():
+    print("=== Testing best configuration ===")
+
+    def result(name, accuracy, parameters, latency, train_time=1.0):
+        return {"name": name, "accuracy": accuracy, "parameters": parameters,
+                "latency": latency, "train_time": train_time}
+
+    results = [
+        result("accurate but big", 1.0, 500, 1e-5),
+        result("small but bad", 0.5, 50, 1e-6),
+        result("small and slow", 0.9, 100, 3e-5),
+        result("small and fast", 0.85, 100, 2e-5, train_time=2.0),
+        result("small, fast, trained faster", 0.8, 100, 2e-5, train_time=1.0),
+    ]
+    # fewest parameters first, then latency, then training time
+    assert best_config(results, 0.8)["name"] == "small, fast, trained faster"
+    assert best_config(results, 0.85)["name"] == "small and fast"
+    assert best_config(results, 0.9)["name"] == "small and slow"
+    assert best_config(results, 0.95)["name"] == "accurate but big"
+    assert best_config(results, 0.4)["name"] == "small but bad"
+    assert best_config(results, 1.01) is None
+    assert best_config([], 0.5) is None
+    print("✅ The smallest, then fastest configuration over the accuracy bar wins")
+
+if __name__ == "__main__":
+    test_split_patterns()
+    test_best_config()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script untuk single pass text normalization (text_normalizer.py)
+"""
+
+import random
+import re
+import time
+
+import math_utils
+import preprocessing
+
+# Frozen copies of the cleaners before text_normalizer.py, the golden
+# reference for the single pass versions.
+
+def legacy_clean_pdf_extracted_text(text):
+    text = re.sub(r'\r\n|\r|\n', '\n', text)
+    text = re.sub(r'\s*=\s*', ' = ', text)
+    text = re.sub(r'\s*\*\s*', ' * ', text)
+    text = re.sub(r'\s*/\s*', ' / ', text)
+    text = re.sub(r'\s*\+\s*', ' + ', text)
+    text = re.sub(r'\s*-\s*', ' - ', text)
+    text = re.sub(r'\s*\(\s*', ' (', text)
+    text = re.sub(r'\s*\)\s*', ') ', text)
+    text = re.sub(r'√\s*', 'sqrt(', text)
+    text = re.sub(r'√', 'sqrt(', text)
+    text = re.sub(r'sisi\s*2', 'sisi**2', text, flags=re.IGNORECASE)
+    text = re.sub(r'(\w+)\s*2(?!\d)', r'\1**2', text)
+    replacements = {
+        'Pers egi': 'Persegi',
+        'Segiti ga': 'Segitiga',
+        'Panjang  *': 'Panjang *',
+        'lebar': 'lebar',
+        'alas  *': 'alas *',
+        'tinggi': 'tinggi',
+        '𝑥2': 'x**2',
+        'x2': 'x**2'
+    }
+    for old, new in replacements.items():
+        text = re.sub(re.escape(old), new, text, flags=re.IGNORECASE)
+    text = re.sub(r'\s{2,}', ' ', text)
+    return '\n'.join(line.strip() for line in text.split('\n') if line.strip())
+
+def legacy_clean_single_line(line):
+    line = re.sub(r'\s*=\s*', ' = ', line)
+    line = re.sub(r'\s*\*\*\s*', '**', line)
+    line = re.sub(r'\s*\*\s*', ' * ', line)
+    line = re.sub(r'\s*/\s*', ' / ', line)
+    line = re.sub(r'\s*\+\s*', ' + ', line)
+    line = re.sub(r'\s*-\s*', ' - ', line)
+    line = re.sub(r'\s*\(\s*', '(', line)
+    line = re.sub(r'\s*\)\s*', ')', line)
+    line = re.sub(r'𝑥', 'x', line)
+    line = re.sub(r'√', 'sqrt', line)
+    line = re.sub(r'sisi\s*\*\*\s*2', 'sisi**2', line, flags=re.IGNORECASE)
+    line = re.sub(r'(\w+)\s*\*\*\s*2', r'\1**2', line)
+    line = re.sub(r'Pers\s+egi', 'Persegi', line, flags=re.IGNORECASE)
+    line = re.sub(r'Segiti\s+ga', 'Segitiga', line, flags=re.IGNORECASE)
+    line = re.sub(r'Men\s+cari', 'Mencari', line, flags=re.IGNORECASE)
+    line = re.sub(r'\s{2,}', ' ', line)
+    return line.strip()
+
+def legacy_normalize_formula_text(text):
+    text = text.lower()
+    text = re.sub(r'\s*=\s*', '=', text)
+    text = re.sub(r'\s*\*\s*', '*', text)
+    text = re.sub(r'\s*/\s*', '/', text)
+    text = re.sub(r'\s*\+\s*', '+', text)
+    text = re.sub(r'\s*-\s*', '-', text)
+    text = re.sub(r'\s*\(\s*', '(', text)
+    text = re.sub(r'\s*\)\s*', ')', text)
+    return text
+
+CLEANERS = [
+    ("clean_pdf_extracted_text", preprocessing.clean_pdf_extracted_text, legacy_clean_pdf_extracted_text),
+    ("clean_single_line", math_utils.clean_single_line, legacy_clean_single_line),
+    ("normalize_formula_text", preprocessing.normalize_formula_text, legacy_normalize_formula_text),
+]
+
+PDF_TEXT = ("Persegi Panjang = Panjang * lebar \nPersegi = sisi2 \n"
+            "Segitiga = (alas * tinggi) / 2 \nMencari akar = √𝑥\n2\n \n")
+
+SAMPLES = [
+    PDF_TEXT,
+    "Persegi Panjang  = Panjang  * lebar\r\nPers egi = sisi2\rSegiti ga = (alas * tinggi) / 2",
+    "Men cari akar = √ 𝑥2 + √(a**2 + b ** 2)",
+    "Luas = SISI 2 , Keliling = 4*sisi23 - x23 + X2 * 𝑥25",
+    "a2b2 x 2 2 2 ((a)) )( = =* ** - -+",
+    "LEBAR x TINGGI\n\n\nTinggi\t\tlebar  \n  ",
+    "",
+]
+
+def test_golden_outputs():
+    print("=== Testing golden outputs ===")
+
+    for name, cleaner, legacy in CLEANERS:
+        for sample in SAMPLES:
+            assert cleaner(sample) == legacy(sample), f"{name}({sample!r})"
+    print(f"   {PDF_TEXT!r}\n-> {preprocessing.clean_pdf_extracted_text(PDF_TEXT)!r}")
+
+    # random mixes of the pieces every rule reacts to
+    pieces = ['sisi', 'SISI', 'x', 'X', '𝑥', '√', '2', '22', '3', 'a', '_', 'Pers', 'egi',
+              'Segiti', 'ga', 'LEBAR', 'Tinggi', 'Men', 'cari', 'alas', 'Panjang', '.', ',',
+              ' ', '  ', '\n', '\r\n', '\r', '\t', '=', '*', '**', '/', '+', '-', '(', ')']
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+        for name, cleaner, legacy in CLEANERS:
+            assert cleaner(text) == legacy(text), f"{name}({text!r})"
+
+    print("✅ Single pass output matches the sequential passes")
+
+def test_throughput():
+    print("=== Testing throughput ===")
+
+    prose = ("Luas lingkaran adalah pi kali jari jari kuadrat, yaitu L = π × r2 untuk setiap "
+             "nilai r yang positif. Keliling persegi panjang = 2 * (panjang + lebar).\n")
+    text = (PDF_TEXT + prose) * 3000
+    size = len(text.encode("utf-8")) / 1e6
+    lines = text.split('\n')
+
+    for name, single_pass, legacy in [
+        ("clean_pdf_extracted_text", preprocessing.clean_pdf_extracted_text, legacy_clean_pdf_extracted_text),
+        ("clean_single_line", lambda t: [math_utils.clean_single_line(line) for line in lines],
+         lambda t: [legacy_clean_single_line(line) for line in lines]),
+    ]:
+        timings = []
+        for cleaner in (legacy, single_pass):
+            start = time.perf_counter()
+            cleaner(text)
+            timings.append(size / (time.perf_counter() - start))
+        print(f"   {name} on {size:.1f}MB: {timings[0]:.1f}MB/s before, {timings[1]:.1f}MB/s single pass")
+
+    assert preprocessing.clean_pdf_extracted_text(text) == legacy_clean_pdf_extracted_text(text)
+    print("✅ Throughput measured")
+
+if __name__ == "__main__":
+    test_golden_outputs()
+    test_throughput()
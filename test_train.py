@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script untuk training intent classifier (train_model, train)
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+import torch
+
+import train as train_module
+from nltk_utils import BagOfWordsEncoder, SparseBagMatrix
+from train import SparseBatches, intent_hash, load_corpus_cache, train, train_model
+
+def toy_data(n_classes=3, words_per_class=4, rows_per_class=6, seed=0):
+    """bag of words rows where every class has its own words, easy to separate"""
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n_classes * rows_per_class, n_classes * words_per_class), dtype=np.float32)
+    y = np.repeat(np.arange(n_classes), rows_per_class).astype(np.int64)
+    for row, label in enumerate(y):
+        words = label * words_per_class + rng.choice(words_per_class, size=2, replace=False)
+        X[row, words] = 1
+    return X, y
+
+def accuracy(model, X, y):
+    with torch.no_grad():
+        return float((model(torch.from_numpy(X)).argmax(dim=1).numpy() == y).mean())
+
+def test_full_batch_and_early_stop():
+    print("=== Testing full batch training and early stopping ===")
+
+    X, y = toy_data()
+    torch.manual_seed(0)
+    model, stats = train_model(X, y, 3, num_epochs=300, learning_rate=0.05,
+                               full_batch=True, device=torch.device('cpu'), verbose=False)
+    print(f"   full batch: {stats['epochs']} epochs, loss {stats['final_loss']:.4f}")
+    assert stats["epochs"] == 300
+    assert stats["final_loss"] < 0.1
+    assert accuracy(model, X, y) == 1.0
+
+    # nothing improves with a zero learning rate: the first epoch sets the
+    # best loss, patience more epochs later training stops
+    for full_batch in [True, False]:
+        torch.manual_seed(0)
+        _, stats = train_model(X, y, 3, num_epochs=1000, learning_rate=0.0,
+                               full_batch=full_batch, patience=5,
+                               device=torch.device('cpu'), verbose=False)
+        print(f"   patience 5, full_batch={full_batch}: stopped after {stats['epochs']} epochs")
+        assert stats["epochs"] == 6
+
+    _, stats = train_model(X, y, 3, num_epochs=0, full_batch=True,
+                           device=torch.device('cpu'), verbose=False)
+    assert stats["epochs"] == 0 and np.isnan(stats["final_loss"])
+    print("✅ Full batch training converges and patience stops it early")
+
+def test_retrain_only_on_changes():
+    print("=== Testing training fingerprint and corpus cache ===")
+
+    intents = {"intents": [
+        {"tag": "greeting", "patterns": ["Hi", "Hello there"], "responses": ["Hey"]},
+        {"tag": "goodbye", "patterns": ["Bye", "See you later"], "responses": ["Bye"]},
+    ]}
+    # sentences prepare_corpus tokenizes, the ones not in the corpus cache
+    tokenized = []
+    tokenize = train_module.tokenize
+
+    def counting_tokenize(sentence):
+        tokenized.append(sentence)
+        return tokenize(sentence)
+
+    train_module.tokenize = counting_tokenize
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        intents_file = os.path.join(tmp_dir, "intents.json")
+        cache_file = os.path.join(tmp_dir, "corpus_cache.json")
+
+        def run(**hyperparams):
+            with open(intents_file, "w") as f:
+                json.dump(intents, f)
+            tokenized.clear()
+            return train(intents_file, os.path.join(tmp_dir, "data.pth"), num_epochs=5,
+                         cache_file=cache_file, verbose=False, **hyperparams)
+
+        try:
+            assert not run()["skipped"]
+            assert sorted(tokenized) == ["Bye", "Hello there", "Hi", "See you later"]
+            assert os.path.exists(os.path.join(tmp_dir, "data.bin"))
+
+            # responses are not trained on
+            intents["intents"][0]["responses"].append("Hello!")
+            assert run()["skipped"]
+            assert tokenized == []
+
+            # a new pattern retrains, only its intent is tokenized again
+            old_key = intent_hash(intents["intents"][0])
+            intents["intents"][0]["patterns"].append("Good morning")
+            assert not run()["skipped"]
+            assert sorted(tokenized) == ["Good morning", "Hello there", "Hi"]
+            cache = load_corpus_cache(cache_file)
+            assert old_key not in cache
+            assert set(cache) == {intent_hash(intent) for intent in intents["intents"]}
+
+            # so do other hyperparameters, with every intent from the cache
+            assert not run(hidden_size=4)["skipped"]
+            assert tokenized == []
+            assert run(hidden_size=4)["skipped"]
+
+            # removed intents are pruned from the cache
+            intents["intents"].pop()
+            assert not run(hidden_size=4)["skipped"]
+            assert set(load_corpus_cache(cache_file)) == {intent_hash(intents["intents"][0])}
+        finally:
+            train_module.tokenize = tokenize
+
+    print("✅ Only pattern and hyperparameter changes retrain, unchanged intents come from the cache")
+
+def test_encode_batch_parity():
+    print("=== Testing encode_batch against encode ===")
+
+    sentences = [["Hello", "how", "are", "you", "?"], [], ["unknown", "words"],
+                 ["thanks", "thank", "you", "you"], ["Bye", "organizing", "organization"]]
+    for words in [["hi", "hello", "i", "you", "bye", "thank", "organ"],
+                  # a duplicated word owns both of its columns
+                  ["hello", "you", "hello", "bye"]]:
+        encoder = BagOfWordsEncoder(words)
+        bags = encoder.encode_batch(sentences)
+        assert isinstance(bags, SparseBagMatrix)
+        assert bags.shape == (len(sentences), len(words))
+        expected = np.stack([encoder.encode(sentence) for sentence in sentences])
+        assert np.array_equal(bags.to_dense(), expected)
+        for row, sentence in enumerate(sentences):
+            assert bags.row(row).tolist() == encoder.indices(sentence)
+        print(f"   {len(words)} words: {bags.indptr.tolist()}")
+    print("✅ CSR rows match the dense bags")
+
+def test_sparse_training():
+    print("=== Testing training on sparse COO batches ===")
+
+    X, y = toy_data()
+    indptr = np.concatenate([[0], np.cumsum((X > 0).sum(axis=1))])
+    X_sparse = SparseBagMatrix(indptr, np.nonzero(X)[1], X.shape[1])
+    assert np.array_equal(X_sparse.to_dense(), X)
+
+    # every row exactly once per pass, in batches of batch_size
+    y_labels = torch.from_numpy(y)
+    batches = list(SparseBatches(X_sparse, y_labels, 4, torch.device('cpu')))
+    assert [len(labels) for _, labels in batches] == [4, 4, 4, 4, 2]
+    assert sorted(torch.cat([labels for _, labels in batches]).tolist()) == sorted(y.tolist())
+    for words, labels in batches:
+        assert words.is_sparse
+        for dense_row, label in zip(words.to_dense().numpy(), labels.tolist()):
+            assert any(np.array_equal(dense_row, X[row]) and y[row] == label for row in range(len(y)))
+
+    for full_batch in [False, True]:
+        torch.manual_seed(0)
+        model, stats = train_model(X_sparse, y, 3, num_epochs=100, learning_rate=0.05,
+                                   batch_size=4, full_batch=full_batch,
+                                   device=torch.device('cpu'), verbose=False)
+        print(f"   full_batch={full_batch}: loss {stats['final_loss']:.4f}")
+        assert accuracy(model, X, y) == 1.0
+    print("✅ The dense model trains on sparse batches")
+
+if __name__ == "__main__":
+    test_full_batch_and_early_stop()
+    test_retrain_only_on_changes()
+    test_encode_batch_parity()
+    test_sparse_training()
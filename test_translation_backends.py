@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script untuk batched translation backends dengan stub HTTP server
+"""
+
+import os
+import tempfile
+import time
+
+import math_utils
+import translation_cache
+from translation_backends import (
+    GlossaryBackend,
+    HTTPTranslationBackend,
+    TranslationBackend,
+    mask_operators,
+    unmask_operators
+)
+from translation_cache import TranslationCache
+from translation_stub_server import start_stub_server
+
+TEXT = "\n".join(f"Luas Persegi Panjang {i} = Panjang * lebar\nPersegi {i} = sisi**2 + (alas * tinggi) / 2"
+                 for i in range(100))
+
+def test_operator_masking():
+    print("=== Testing operator masking ===")
+
+    masked, operators = mask_operators("persegi = sisi**2 + (alas * tinggi) / 2")
+    print(f"   {masked!r} {operators}")
+    assert operators == [' = ', '**', ' + (', ' * ', ') / ']
+    assert "*" not in masked and "(" not in masked
+    assert unmask_operators(masked.replace("persegi", "square"), operators) == \
+        "square = sisi * * 2 +(alas * tinggi)/ 2"
+    # a placeholder the service dropped
+    assert unmask_operators(masked.replace("__2__", ""), operators) is None
+
+    # hyphenated words stay whole, the glossary knows "jari-jari"
+    masked, operators = mask_operators("luas = 3.14 * jari-jari * jari-jari - 1")
+    print(f"   {masked!r} {operators}")
+    assert masked.count("jari-jari") == 2
+    assert operators == [' = ', ' * ', ' * ', ' - ']
+
+    print("✅ Operators survive the translation service")
+
+def test_batched_backend():
+    print("=== Testing batched HTTP backend ===")
+
+    lines = math_utils.clean_pdf_extracted_text(TEXT).split("\n") + ["jari-jari = 7", "3.14 * jari-jari * jari-jari"]
+    expected = GlossaryBackend().translate(lines)
+    server = start_stub_server(latency=0.05)
+    try:
+        backend = HTTPTranslationBackend(server.url, batch_size=10, max_concurrency=4)
+        start = time.perf_counter()
+        translations = backend.translate(lines)
+        elapsed = time.perf_counter() - start
+        print(f"   {len(lines)} lines, 0.05s per request: {elapsed:.2f}s, stats {server.stats}")
+
+        # same translations as the offline glossary, in order
+        assert translations == expected
+        assert translations[-2:] == ["radius = 7", "3.14 * radius * radius"]
+        assert server.stats["requests"] == 21 and server.stats["lines"] == 202
+        assert 1 < server.stats["max_in_flight"] <= 4
+        # 21 requests 4 at a time, one per line would take 10s
+        assert elapsed < 21 * 0.05
+
+        with tempfile.TemporaryDirectory() as tmp:
+            translation_cache.translation_cache = TranslationCache(os.path.join(tmp, "translations.db"))
+            try:
+                assert math_utils.translate_lines(lines, backend) == expected
+                requests = server.stats["requests"]
+                assert math_utils.translate_lines(lines, backend) == expected
+                assert server.stats["requests"] == requests, "warm lines were sent again"
+            finally:
+                translation_cache.translation_cache.close()
+                translation_cache.translation_cache = None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("✅ Lines are translated in concurrent batches, in order")
+
+def test_backend_failure():
+    print("=== Testing unreachable backend ===")
+
+    server = start_stub_server()
+    url = server.url
+    server.shutdown()
+    server.server_close()
+
+    lines = ["Luas Persegi = sisi * sisi", "Keliling = 4 * sisi"]
+    backend = HTTPTranslationBackend(url, batch_size=1, timeout=1)
+    assert backend.translate(lines) == [None, None]
+    with tempfile.TemporaryDirectory() as tmp:
+        translation_cache.translation_cache = TranslationCache(os.path.join(tmp, "translations.db"))
+        try:
+            # the glossary translates what the backend couldn't, nothing is cached
+            assert math_utils.translate_lines(lines, backend) == GlossaryBackend().translate(lines)
+            assert translation_cache.translation_cache.get_many(lines, backend.version) == {}
+        finally:
+            translation_cache.translation_cache.close()
+            translation_cache.translation_cache = None
+
+    # a backend has to translate batches
+    try:
+        TranslationBackend()
+        assert False, "abstract backend instantiated"
+    except TypeError:
+        pass
+
+    print("✅ Failed batches fall back to the glossary")
+
+if __name__ == "__main__":
+    test_operator_masking()
+    test_batched_backend()
+    test_backend_failure()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script untuk persistent translation cache (translation_cache.py)
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import math_utils
+import translation_cache
+from translation_cache import TranslationCache
+
+def test_translation_cache():
+    print("=== Testing translation cache ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "translations.db")
+        cache = TranslationCache(path)
+        cache.put("Luas Persegi = sisi * sisi", "v1", "area square = side * side")
+
+        # the key is the normalized line and the translator version
+        assert cache.get("  luas persegi = sisi * sisi ", "v1") == "area square = side * side"
+        assert cache.get("Luas Persegi = sisi * sisi", "v2") is None
+        cache.close()
+
+        # a new process (or worker) reads what this one wrote
+        code = ("from translation_cache import TranslationCache; "
+                f"cache = TranslationCache({path!r}); "
+                "print(cache.get('Luas Persegi = sisi * sisi', 'v1')); "
+                "cache.put('keliling = 4 * sisi', 'v1', 'perimeter = 4 * side')")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert output.stdout.strip() == "area square = side * side"
+        assert TranslationCache(path).get("keliling = 4 * sisi", "v1") == "perimeter = 4 * side"
+
+        # a cache file that can't be opened leaves the memory cache working
+        broken = TranslationCache(os.path.join(tmp, "missing", "translations.db"))
+        broken.put("luas", "v1", "area")
+        assert broken.get("luas", "v1") == "area" and broken.path is None
+
+    print("✅ Translations are shared through the cache file")
+
+def test_cached_translation():
+    print("=== Testing cached translate_indonesian_to_english ===")
+
+    text = "\n".join(f"Luas Persegi Panjang {i} = Panjang * lebar" for i in range(200))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "translations.db")
+        translation_cache.translation_cache = TranslationCache(path)
+        try:
+            start = time.perf_counter()
+            cold = math_utils.translate_indonesian_to_english(text)
+            cold_time = time.perf_counter() - start
+
+            lines = cold.split("\n")
+            assert len(lines) == 200 and lines[0] == "area rectangle 0 = length * width"
+            start = time.perf_counter()
+            assert math_utils.translate_lines(math_utils.clean_pdf_extracted_text(text).split("\n")) == lines
+            warm_time = time.perf_counter() - start
+
+            # another worker starts with an empty memory cache
+            translation_cache.translation_cache = TranslationCache(path)
+            assert math_utils.translate_indonesian_to_english(text) == cold
+            print(f"   200 lines: {cold_time * 1000:.1f}ms cold, {warm_time * 1000:.1f}ms warm")
+        finally:
+            translation_cache.translation_cache.close()
+            translation_cache.translation_cache = None
+
+    print("✅ Repeated documents are translated from the cache")
+
+if __name__ == "__main__":
+    test_translation_cache()
+    test_cached_translation()
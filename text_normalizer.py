@@ -0,0 +1,187 @@
+"""
+Single pass text normalization for PDF extracted text.
+
+The cleaners in preprocessing.py and math_utils.py used to run a dozen
+re.sub passes over the whole text, each one copying it. A TextNormalizer
+tokenizes the text once and writes every token in its final form:
+
+  operators    a run of operators with the whitespace around it, spaced
+               the way the sequential passes left it
+  word chunks  words separated only by whitespace; symbol mapping, power
+               fixes and broken-word repairs only ever match inside one,
+               so they run on the chunk (and only when it can match)
+  symbols      √ and friends, mapped character by character
+  whitespace   collapsed as it is written
+
+The output is the same as running the old passes one after another, see
+test_text_normalizer.py for the comparison against frozen copies.
+"""
+
+import re
+
+from cache_utils import LRUCache
+
+MULTIPLE_SPACES = re.compile(r'\s{2,}')
+MAX_CACHED_TOKEN = 64
+
+
+class TextNormalizer:
+    def __init__(self, operators, symbols=None, symbols_eating_space='',
+                 repairs=(), lowercase_words=(), collapse_spaces=True,
+                 normalize_newlines=False):
+        """
+        operators: (operator, space before, space after) in the order the
+        old passes ran, a later pass rewrites the whitespace between two
+        operators. symbols: character -> replacement, symbols_eating_space
+        also drop the whitespace after them. repairs: (pattern, replacement)
+        applied in order to word chunks. lowercase_words are lowercased
+        wherever they appear, in any case.
+        """
+        self.order = {}
+        self.spacing = {}
+        for index, (op, before, after) in enumerate(operators):
+            self.order[op] = index
+            self.spacing[op] = (before, after)
+        self.symbols = str.maketrans(symbols or {})
+        self.symbol_search = re.compile(f"[{re.escape(''.join(symbols))}]").search if symbols else None
+        self.symbols_eating_space = symbols_eating_space
+        self.repairs = [(re.compile(pattern, flags), replacement)
+                        for pattern, replacement, flags in repairs]
+        # a chunk none of the repairs can match is written as it is
+        self.repair_search = re.compile('|'.join(
+            f"(?{'i' if flags & re.IGNORECASE else ''}:{pattern})"
+            for pattern, _, flags in repairs)).search if repairs else None
+        # their own search, a chunk with "lebar" doesn't rerun every repair
+        self.lowercase = re.compile('|'.join(map(re.escape, lowercase_words)),
+                                    re.IGNORECASE) if lowercase_words else None
+        self.collapse_spaces = collapse_spaces
+        self.normalize_newlines = normalize_newlines
+
+        ops = f"[{re.escape(''.join(self.order))}]"
+        other = f"[^\\w\\s{re.escape(''.join(self.order))}]+"
+        self.tokens = re.compile(
+            rf"(\s*{ops}(?:\s*{ops})*\s*)"   # 1: operators with their whitespace
+            rf"|(\w+(?:\s+\w+)*)"             # 2: word chunk
+            rf"|(\s+)"                         # 3: whitespace
+            rf"|({other})"                     # 4: anything else
+        ).finditer
+        # token -> written form, operator runs and word chunks never collide
+        self.written_tokens = LRUCache(maxsize=4096)
+
+    def write_operators(self, token):
+        """the written form of operators and their whitespace, ' *( - ' -> ' * (- '"""
+        ops = ''.join(token.split())
+        parts = [self.spacing[ops[0]][0]]
+        for previous, current in zip(ops, ops[1:]):
+            parts.append(previous)
+            if previous == current:
+                # one pass spaces both, the spaces add up
+                parts.append(self.spacing[previous][1] + self.spacing[current][0])
+            elif self.order[previous] > self.order[current]:
+                parts.append(self.spacing[previous][1])
+            else:
+                parts.append(self.spacing[current][0])
+        parts.append(ops[-1])
+        parts.append(self.spacing[ops[-1]][1])
+        return self.write_space_runs(''.join(parts))
+
+    def write_chunk(self, chunk):
+        if self.normalize_newlines and '\r' in chunk:
+            chunk = chunk.replace('\r\n', '\n').replace('\r', '\n')
+        if self.symbol_search and self.symbol_search(chunk):
+            chunk = chunk.translate(self.symbols)
+        if self.repair_search and self.repair_search(chunk):
+            for pattern, replacement in self.repairs:
+                chunk = pattern.sub(replacement, chunk)
+        if self.lowercase and self.lowercase.search(chunk):
+            chunk = self.lowercase.sub(lambda match: match.group(0).lower(), chunk)
+        return self.write_space_runs(chunk)
+
+    def write_space_runs(self, text):
+        if self.collapse_spaces and MULTIPLE_SPACES.search(text):
+            return MULTIPLE_SPACES.sub(' ', text)
+        return text
+
+    def write_space(self, space):
+        if self.normalize_newlines and '\r' in space:
+            space = space.replace('\r\n', '\n').replace('\r', '\n')
+        if self.collapse_spaces and len(space) > 1:
+            return ' '
+        return space
+
+    def normalize(self, text):
+        out = []
+        written_tokens = self.written_tokens
+        eat_space = False
+        for token in self.tokens(text):
+            kind = token.lastindex
+            value = token.group(kind)
+            if kind == 3:
+                if not eat_space:
+                    out.append(value if value == ' ' else self.write_space(value))
+                eat_space = False
+                continue
+            if kind == 4:
+                out.append(value.translate(self.symbols) if self.symbol_search else value)
+                eat_space = value[-1] in self.symbols_eating_space
+                continue
+
+            # operator runs and word chunks repeat a lot in formulas
+            written = written_tokens.get(value)
+            if written is None:
+                written = self.write_operators(value) if kind == 1 else self.write_chunk(value)
+                if len(value) <= MAX_CACHED_TOKEN:
+                    written_tokens.put(value, written)
+            if eat_space and kind == 1:
+                written = written.lstrip()
+            out.append(written)
+            eat_space = False
+
+        text = ''.join(out)
+        return text.strip() if self.collapse_spaces else text
+
+
+# preprocessing.clean_pdf_extracted_text
+PDF_TEXT = TextNormalizer(
+    operators=[('=', ' ', ' '), ('*', ' ', ' '), ('/', ' ', ' '), ('+', ' ', ' '),
+               ('-', ' ', ' '), ('(', ' ', ''), (')', '', ' ')],
+    symbols={'√': 'sqrt('},
+    symbols_eating_space='√',
+    repairs=[
+        # "sisi2" and any other "word2" are squares
+        (r'sisi\s*2', 'sisi**2', re.IGNORECASE),
+        (r'(\w+)\s*2(?!\d)', r'\1**2', 0),
+        # words broken by the PDF layout
+        (r'Pers egi', 'Persegi', re.IGNORECASE),
+        (r'Segiti ga', 'Segitiga', re.IGNORECASE),
+        (r'𝑥2', 'x**2', re.IGNORECASE),
+        (r'x2', 'x**2', re.IGNORECASE),
+    ],
+    # the old 'lebar' -> 'lebar' and 'tinggi' -> 'tinggi' replacements
+    lowercase_words=['lebar', 'tinggi'],
+    normalize_newlines=True,
+)
+
+# math_utils.clean_single_line, "**" ends up as " * * " like before
+FORMULA_LINE = TextNormalizer(
+    operators=[('=', ' ', ' '), ('*', ' ', ' '), ('/', ' ', ' '), ('+', ' ', ' '),
+               ('-', ' ', ' '), ('(', '', ''), (')', '', '')],
+    symbols={'𝑥': 'x', '√': 'sqrt'},
+    repairs=[
+        (r'Pers\s+egi', 'Persegi', re.IGNORECASE),
+        (r'Segiti\s+ga', 'Segitiga', re.IGNORECASE),
+        (r'Men\s+cari', 'Mencari', re.IGNORECASE),
+    ],
+)
+
+# math_utils.translate_single_line, after the glossary
+TRANSLATED_LINE = TextNormalizer(
+    operators=[('*', ' ', ' '), ('=', ' ', ' '), ('/', ' ', ' '), ('+', ' ', ' '),
+               ('-', ' ', ' '), ('(', '', ''), (')', '', '')],
+)
+
+# preprocessing.normalize_formula_text, on lowercased text
+FORMULA_TEXT = TextNormalizer(
+    operators=[(op, '', '') for op in '=*/+-()'],
+    collapse_spaces=False,
+)
@@ -1,70 +1,123 @@
+import os
 import numpy as np
 import random
 import json
+import time
+import hashlib
+import argparse
 
 import torch
 import torch.nn as nn
 from torch.utils.data import Dataset, DataLoader
 
-from nltk_utils import bag_of_words, tokenize, stem
-from model import NeuralNet
-
-with open('intents.json', 'r') as f:
-    intents = json.load(f)
-
-all_words = []
-tags = []
-xy = []
-# loop through each sentence in our intents patterns
-for intent in intents['intents']:
-    tag = intent['tag']
-    # add to tag list
-    tags.append(tag)
-    for pattern in intent['patterns']:
-        # tokenize each word in the sentence
-        w = tokenize(pattern)
-        # add to our words list
-        all_words.extend(w)
-        # add to xy pair
-        xy.append((w, tag))
-
-# stem and lower each word
-ignore_words = ['?', '.', '!']
-all_words = [stem(w) for w in all_words if w not in ignore_words]
-# remove duplicates and sort
-all_words = sorted(set(all_words))
-tags = sorted(set(tags))
-
-print(len(xy), "patterns")
-print(len(tags), "tags:", tags)
-print(len(all_words), "unique stemmed words:", all_words)
-
-# create training data
-X_train = []
-y_train = []
-for (pattern_sentence, tag) in xy:
+from nltk_utils import BagOfWordsEncoder, SparseBagMatrix, tokenize, stem, stem_cache
+from model import build_model
+from numpy_model import NUMPY_FILE, export_weights
+
+FILE = "data.pth"
+CORPUS_CACHE_FILE = "corpus_cache.json"
+
+
+def load_intents(intents_file='intents.json'):
+    with open(intents_file, 'r') as f:
+        return json.load(f)
+
+
+def content_hash(obj):
+    """sha256 of the canonical JSON form of obj"""
+    text = json.dumps(obj, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def intent_hash(intent):
+    """hash of the training-relevant part of an intent (responses don't count)"""
+    return content_hash([intent['tag'], intent['patterns']])
+
+
+def training_fingerprint(intents, hyperparams):
+    """hash of every intent's tag and patterns plus the hyperparameters"""
+    return content_hash({
+        "intents": [intent_hash(intent) for intent in intents['intents']],
+        "hyperparams": hyperparams,
+    })
+
+
+def load_corpus_cache(cache_file=CORPUS_CACHE_FILE):
+    if cache_file is None or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_corpus_cache(cache, cache_file=CORPUS_CACHE_FILE):
+    if cache_file is None:
+        return
+    with open(cache_file, 'w') as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+
+def prepare_corpus(intents, cache=None):
+    """
+    tokenize the intents patterns, returns the stemmed vocabulary,
+    the sorted tags and the (tokenized pattern, tag) pairs.
+    cache maps intent_hash -> tokenized patterns and token stems; unchanged
+    intents are taken from it, the others are tokenized and stored in it.
+    """
+    if cache is None:
+        cache = {}
+    all_words = []
+    tags = []
+    xy = []
+    # loop through each sentence in our intents patterns
+    for intent in intents['intents']:
+        tag = intent['tag']
+        # add to tag list
+        tags.append(tag)
+        key = intent_hash(intent)
+        if key not in cache:
+            patterns = [tokenize(pattern) for pattern in intent['patterns']]
+            stems = {w: stem(w) for words in patterns for w in words}
+            cache[key] = {"patterns": patterns, "stems": stems}
+        else:
+            # make the cached stems available to stem() and the encoder
+            for w, stemmed in cache[key]["stems"].items():
+                stem_cache.put(w, stemmed)
+        for w in cache[key]["patterns"]:
+            # add to our words list
+            all_words.extend(w)
+            # add to xy pair
+            xy.append((w, tag))
+
+    # stem and lower each word
+    ignore_words = ['?', '.', '!']
+    all_words = [stem(w) for w in all_words if w not in ignore_words]
+    # remove duplicates and sort
+    all_words = sorted(set(all_words))
+    tags = sorted(set(tags))
+    return all_words, tags, xy
+
+
+def build_training_data(xy, all_words, tags):
+    """
+    create training data in one pass: X is a SparseBagMatrix (CSR) with
+    one bag of words row per pattern, y the tag ids
+    """
+    bag_encoder = BagOfWordsEncoder(all_words)
     # X: bag of words for each pattern_sentence
-    bag = bag_of_words(pattern_sentence, all_words)
-    X_train.append(bag)
+    X_train = bag_encoder.encode_batch(pattern_sentence for (pattern_sentence, tag) in xy)
     # y: PyTorch CrossEntropyLoss needs only class labels, not one-hot
-    label = tags.index(tag)
-    y_train.append(label)
+    tag_to_id = {tag: idx for idx, tag in enumerate(tags)}
+    y_train = np.fromiter((tag_to_id[tag] for (pattern_sentence, tag) in xy),
+                          dtype=np.int64, count=len(xy))
+    return X_train, y_train
 
-X_train = np.array(X_train)
-y_train = np.array(y_train)
-
-# Hyper-parameters 
-num_epochs = 1000
-batch_size = 8
-learning_rate = 0.001
-input_size = len(X_train[0])
-hidden_size = 8
-output_size = len(tags)
-print(input_size, output_size)
 
 class ChatDataset(Dataset):
 
-    def __init__(self):
+    def __init__(self, X_train, y_train):
         self.n_samples = len(X_train)
         self.x_data = X_train
         self.y_data = y_train
@@ -77,53 +130,276 @@ class ChatDataset(Dataset):
     def __len__(self):
         return self.n_samples
 
-dataset = ChatDataset()
-train_loader = DataLoader(dataset=dataset,
-                          batch_size=batch_size,
-                          shuffle=True,
-                          num_workers=0)
-
-device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-
-model = NeuralNet(input_size, hidden_size, output_size).to(device)
-
-# Loss and optimizer
-criterion = nn.CrossEntropyLoss()
-optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
-
-# Train the model
-for epoch in range(num_epochs):
-    for (words, labels) in train_loader:
-        words = words.to(device)
-        labels = labels.to(dtype=torch.long).to(device)
-        
-        # Forward pass
-        outputs = model(words)
-        # if y would be one-hot, we must apply
-        # labels = torch.max(labels, 1)[1]
-        loss = criterion(outputs, labels)
-        
-        # Backward and optimize
-        optimizer.zero_grad()
-        loss.backward()
-        optimizer.step()
-        
-    if (epoch+1) % 100 == 0:
-        print (f'Epoch [{epoch+1}/{num_epochs}], Loss: {loss.item():.4f}')
-
-
-print(f'final loss: {loss.item():.4f}')
-
-data = {
-"model_state": model.state_dict(),
-"input_size": input_size,
-"hidden_size": hidden_size,
-"output_size": output_size,
-"all_words": all_words,
-"tags": tags
-}
 
-FILE = "data.pth"
-torch.save(data, FILE)
+class SparseBatches:
+    """
+    shuffled mini-batches of sparse tensor rows, one pass per iteration.
+    Every batch is cut from the SparseBagMatrix (CSR), O(batch) instead of
+    an index_select over the whole tensor.
+    """
+
+    def __init__(self, X, y, batch_size, device):
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.device = device
+
+    def __iter__(self):
+        order = np.random.permutation(len(self.X))
+        for start in range(0, len(order), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            yield self.X.select_rows(rows).to_torch(self.device), self.y[rows]
+
+
+class BagInputBatches:
+    """shuffled mini-batches of (indices, offsets) inputs for SparseNeuralNet"""
+
+    def __init__(self, X, y, batch_size, device):
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.device = device
+
+    def __iter__(self):
+        order = np.random.permutation(len(self.X))
+        for start in range(0, len(order), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            yield self.X.select_rows(rows).to_bag_inputs(self.device), self.y[rows]
+
+
+def train_model(X_train, y_train, num_classes, num_epochs=1000, batch_size=8,
+                learning_rate=0.001, hidden_size=8, full_batch=False,
+                patience=None, min_delta=1e-4, model_type="dense", device=None,
+                verbose=True):
+    """
+    Train a NeuralNet on the bag of words matrix, either a dense array or
+    a SparseBagMatrix (fed as sparse tensors, never densified as a whole).
+    model_type "sparse" trains a SparseNeuralNet on the active word
+    indices of a SparseBagMatrix instead.
+    full_batch keeps the whole dataset as one tensor on the device and
+    takes one optimizer step per epoch (no DataLoader). With patience set,
+    training stops once the epoch loss hasn't improved by min_delta for
+    that many epochs.
+    Returns the model and a dict of training stats.
+    """
+    if device is None:
+        device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+
+    input_size = X_train.shape[1]
+    model = build_model(model_type, input_size, hidden_size, num_classes).to(device)
+
+    # Loss and optimizer
+    criterion = nn.CrossEntropyLoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+
+    if model_type == "sparse":
+        if not isinstance(X_train, SparseBagMatrix):
+            raise ValueError("The sparse model needs a SparseBagMatrix as X_train")
+        y_labels = torch.from_numpy(y_train).to(dtype=torch.long, device=device)
+        if full_batch:
+            batches = [(X_train.to_bag_inputs(device), y_labels)]
+        else:
+            batches = BagInputBatches(X_train, y_labels, batch_size, device)
+    elif isinstance(X_train, SparseBagMatrix):
+        y_labels = torch.from_numpy(y_train).to(dtype=torch.long, device=device)
+        if full_batch:
+            batches = [(X_train.to_torch(device), y_labels)]
+        else:
+            batches = SparseBatches(X_train, y_labels, batch_size, device)
+    elif full_batch:
+        batches = [(torch.from_numpy(X_train).to(device),
+                    torch.from_numpy(y_train).to(dtype=torch.long, device=device))]
+    else:
+        batches = DataLoader(dataset=ChatDataset(X_train, y_train),
+                             batch_size=batch_size,
+                             shuffle=True,
+                             num_workers=0)
+
+    best_loss = float('inf')
+    epochs_without_improvement = 0
+    epochs_done = 0
+    epoch_loss = float('nan')
+    start = time.perf_counter()
+
+    # Train the model
+    for epoch in range(num_epochs):
+        epoch_loss = 0.0
+        n_seen = 0
+        for (words, labels) in batches:
+            labels = labels.to(dtype=torch.long).to(device)
+
+            # Forward pass
+            if isinstance(words, tuple):
+                # (indices, offsets) for SparseNeuralNet
+                outputs = model(*words)
+            else:
+                outputs = model(words.to(device))
+            # if y would be one-hot, we must apply
+            # labels = torch.max(labels, 1)[1]
+            loss = criterion(outputs, labels)
+
+            # Backward and optimize
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+            epoch_loss += loss.item() * len(labels)
+            n_seen += len(labels)
+
+        epoch_loss /= n_seen
+        epochs_done = epoch + 1
+
+        if verbose and (epoch+1) % 100 == 0:
+            epoch_time = (time.perf_counter() - start) / epochs_done
+            print (f'Epoch [{epoch+1}/{num_epochs}], Loss: {epoch_loss:.4f}, '
+                   f'{epoch_time * 1000:.2f} ms/epoch')
+
+        if patience is not None:
+            if epoch_loss < best_loss - min_delta:
+                best_loss = epoch_loss
+                epochs_without_improvement = 0
+            else:
+                epochs_without_improvement += 1
+                if epochs_without_improvement >= patience:
+                    if verbose:
+                        print(f'converged after {epochs_done} epochs')
+                    break
+
+    train_time = time.perf_counter() - start
+    stats = {
+        "epochs": epochs_done,
+        "final_loss": epoch_loss,
+        "train_time": train_time,
+        "epoch_time": train_time / epochs_done if epochs_done else 0.0,
+    }
+    return model, stats
+
+
+def train(intents_file='intents.json', output_file=FILE, num_epochs=1000,
+          batch_size=8, learning_rate=0.001, hidden_size=8, full_batch=False,
+          patience=None, min_delta=1e-4, model_type="dense",
+          cache_file=CORPUS_CACHE_FILE, force=False, verbose=True):
+    """
+    Train the intent classifier on intents_file and save it to
+    output_file (plus the NumPy export), returns the training stats.
+    Nothing is trained (stats["skipped"] is True) when output_file was
+    built from the same tags, patterns and hyperparameters, unless force.
+    """
+    intents = load_intents(intents_file)
+    hyperparams = {
+        "num_epochs": num_epochs,
+        "batch_size": batch_size,
+        "learning_rate": learning_rate,
+        "hidden_size": hidden_size,
+        "full_batch": full_batch,
+        "patience": patience,
+        "min_delta": min_delta,
+        "model_type": model_type,
+    }
+    fingerprint = training_fingerprint(intents, hyperparams)
+    numpy_file = NUMPY_FILE if output_file == FILE else os.path.splitext(output_file)[0] + '.bin'
+
+    if not force and os.path.exists(output_file):
+        previous = torch.load(output_file)
+        if previous.get("fingerprint") == fingerprint:
+            if not os.path.exists(numpy_file):
+                export_weights(output_file, numpy_file)
+            if verbose:
+                print(f'{output_file} is up to date with {intents_file}, skipping training')
+            return {"skipped": True, "fingerprint": fingerprint}
+
+    cache = load_corpus_cache(cache_file)
+    all_words, tags, xy = prepare_corpus(intents, cache)
+    # keep only the intents that still exist
+    current = {intent_hash(intent) for intent in intents['intents']}
+    save_corpus_cache({key: value for key, value in cache.items() if key in current}, cache_file)
+
+    if verbose:
+        print(len(xy), "patterns")
+        print(len(tags), "tags:", tags)
+        print(len(all_words), "unique stemmed words:", all_words)
+
+    X_train, y_train = build_training_data(xy, all_words, tags)
+
+    # Hyper-parameters
+    input_size = X_train.shape[1]
+    output_size = len(tags)
+    if verbose:
+        print(input_size, output_size)
+
+    model, stats = train_model(X_train, y_train, output_size,
+                               num_epochs=num_epochs,
+                               batch_size=batch_size,
+                               learning_rate=learning_rate,
+                               hidden_size=hidden_size,
+                               full_batch=full_batch,
+                               patience=patience,
+                               min_delta=min_delta,
+                               model_type=model_type,
+                               verbose=verbose)
+
+    if verbose:
+        print(f'final loss: {stats["final_loss"]:.4f}')
+        print(f'{stats["epochs"]} epochs in {stats["train_time"]:.2f}s '
+              f'({stats["epoch_time"] * 1000:.2f} ms/epoch)')
+
+    data = {
+    "model_type": model_type,
+    "model_state": model.state_dict(),
+    "input_size": input_size,
+    "hidden_size": hidden_size,
+    "output_size": output_size,
+    "all_words": all_words,
+    "tags": tags,
+    "fingerprint": fingerprint
+    }
+
+    # write next to the target and rename, serving workers watching
+    # output_file for hot reload never see a half-written checkpoint
+    tmp_file = output_file + '.tmp'
+    torch.save(data, tmp_file)
+    os.replace(tmp_file, output_file)
+
+    if verbose:
+        print(f'training complete. file saved to {output_file}')
+
+    # plain weight arrays for torch-free inference
+    export_weights(output_file, numpy_file)
+    if verbose:
+        print(f'numpy weights exported to {numpy_file}')
+
+    stats["skipped"] = False
+    stats["fingerprint"] = fingerprint
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the chatbot intent classifier")
+    parser.add_argument("--intents", default="intents.json")
+    parser.add_argument("--output", default=FILE)
+    parser.add_argument("--epochs", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--learning-rate", type=float, default=0.001)
+    parser.add_argument("--hidden-size", type=int, default=8)
+    parser.add_argument("--full-batch", action="store_true",
+                        help="keep the whole dataset as one tensor on the device")
+    parser.add_argument("--patience", type=int, default=None,
+                        help="stop after this many epochs without loss improvement")
+    parser.add_argument("--min-delta", type=float, default=1e-4)
+    parser.add_argument("--model", choices=["dense", "sparse"], default="dense",
+                        help="sparse: EmbeddingBag first layer on the active word indices")
+    parser.add_argument("--force", action="store_true",
+                        help="retrain even if the model matches intents.json")
+    args = parser.parse_args()
 
-print(f'training complete. file saved to {FILE}')
+    train(intents_file=args.intents,
+          output_file=args.output,
+          num_epochs=args.epochs,
+          batch_size=args.batch_size,
+          learning_rate=args.learning_rate,
+          hidden_size=args.hidden_size,
+          full_batch=args.full_batch,
+          patience=args.patience,
+          min_delta=args.min_delta,
+          model_type=args.model,
+          force=args.force)
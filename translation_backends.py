@@ -0,0 +1,134 @@
+"""
+Translation backends for translate_lines. A backend translates a batch
+of lines and returns the translations in the same order, None for a
+line it couldn't translate (translate_lines uses the glossary for those
+and doesn't cache them).
+
+  GlossaryBackend         glossary.json, offline, the default
+  HTTPTranslationBackend  a translation service over HTTP: batches of
+                          lines, a bounded number of requests in flight,
+                          math operators masked so they come back as sent
+
+CHAT_TRANSLATION_BACKEND picks one: "glossary" or the URL of a service
+(translation_stub_server.py is a local stand-in for tests).
+"""
+
+import abc
+import json
+import os
+import re
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from math_utils import translate_single_line, translator_version
+from text_normalizer import TRANSLATED_LINE
+
+TRANSLATION_BACKEND = os.environ.get("CHAT_TRANSLATION_BACKEND", "glossary")
+TRANSLATION_BATCH_SIZE = int(os.environ.get("CHAT_TRANSLATION_BATCH_SIZE", "50"))
+TRANSLATION_CONCURRENCY = int(os.environ.get("CHAT_TRANSLATION_CONCURRENCY", "4"))
+
+# a hyphen between two word characters is part of a word ("jari-jari")
+OPERATOR = r'(?:[=*/+()√^]|(?<!\w)-|-(?!\w))'
+OPERATORS = re.compile(rf'\s*{OPERATOR}(?:\s|{OPERATOR})*')
+PLACEHOLDER = re.compile(r'__(\d+)__')
+
+
+class TranslationBackend(abc.ABC):
+    # part of the translation cache key, change it when translations change
+    version = None
+
+    def translate(self, lines):
+        """translations of lines in order, None where translation failed"""
+        return self.translate_batch(lines)
+
+    @abc.abstractmethod
+    def translate_batch(self, lines):
+        """translations of one batch of lines, in order"""
+
+
+class GlossaryBackend(TranslationBackend):
+    @property
+    def version(self):
+        return translator_version()
+
+    def translate_batch(self, lines):
+        return [translate_single_line(line) for line in lines]
+
+
+def mask_operators(line):
+    """
+    'sisi**2 = 4' -> ('sisi __0__ 2 __1__ 4', ['**', ' = ']), placeholders
+    a translation service passes through unchanged
+    """
+    operators = []
+
+    def placeholder(match):
+        operators.append(match.group(0))
+        return f" __{len(operators) - 1}__ "
+
+    return OPERATORS.sub(placeholder, line), operators
+
+
+def unmask_operators(text, operators):
+    """the operators back in a translated line, None if some were lost"""
+    if sorted(int(index) for index in PLACEHOLDER.findall(text)) != list(range(len(operators))):
+        return None
+    text = PLACEHOLDER.sub(lambda match: operators[int(match.group(1))], text)
+    # spaced like translate_single_line spaces its lines
+    return TRANSLATED_LINE.normalize(text)
+
+
+class HTTPTranslationBackend(TranslationBackend):
+    """
+    POSTs {"q": [lines], "source": "id", "target": "en"} to url, expects
+    {"translations": [...]} back in the same order
+    """
+
+    def __init__(self, url, batch_size=TRANSLATION_BATCH_SIZE, max_concurrency=TRANSLATION_CONCURRENCY,
+                 timeout=10, source="id", target="en"):
+        self.url = url
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.source = source
+        self.target = target
+        self.version = f"http-{url}-{source}-{target}"
+
+    def translate(self, lines):
+        batches = [lines[start:start + self.batch_size] for start in range(0, len(lines), self.batch_size)]
+        if len(batches) <= 1:
+            return self.translate_batch(lines) if lines else []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+            # map keeps the order of the batches
+            return [translation for batch in pool.map(self.translate_batch, batches) for translation in batch]
+
+    def translate_batch(self, lines):
+        masked = [mask_operators(line.lower()) for line in lines]
+        body = json.dumps({"q": [text for text, _ in masked], "source": self.source,
+                           "target": self.target}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                translations = json.loads(response.read().decode("utf-8"))["translations"]
+            if len(translations) != len(lines):
+                raise ValueError(f"{len(translations)} translations for {len(lines)} lines")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Translation backend error: {e}")
+            return [None] * len(lines)
+        return [unmask_operators(translation, operators) if isinstance(translation, str) else None
+                for translation, (_, operators) in zip(translations, masked)]
+
+
+# created on first use by get_translation_backend()
+translation_backend = None
+
+
+def get_translation_backend():
+    """the backend CHAT_TRANSLATION_BACKEND names"""
+    global translation_backend
+    if translation_backend is None:
+        if TRANSLATION_BACKEND.startswith(("http://", "https://")):
+            translation_backend = HTTPTranslationBackend(TRANSLATION_BACKEND)
+        else:
+            translation_backend = GlossaryBackend()
+    return translation_backend
@@ -0,0 +1,124 @@
+"""
+Content-addressed cache of line translations: an in-memory LRUCache in
+front of a SQLite file. The key is sha256(translator version + line), so
+a new glossary or translator never returns stale translations, and the
+file (WAL mode) can be shared by every worker process on the host.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+
+from cache_utils import LRUCache
+
+# next to this file like glossary.json, so workers started from any
+# directory share it. CHAT_TRANSLATION_CACHE="" keeps translations in
+# memory only
+TRANSLATION_CACHE_FILE = os.environ.get(
+    "CHAT_TRANSLATION_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_cache.db"))
+# SQLite allows at most 999 "?" per statement in older versions
+MAX_QUERY_KEYS = 500
+
+
+def normalize_line(line):
+    """lines translate lowercased, whitespace at the ends doesn't matter"""
+    return line.lower().strip()
+
+
+def cache_key(line, version):
+    return hashlib.sha256(f"{version}\n{normalize_line(line)}".encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    def __init__(self, path=TRANSLATION_CACHE_FILE, maxsize=4096):
+        self.path = path
+        self.memory = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+
+    def _connect(self):
+        # a forked worker opens its own connection
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS translations "
+                               "(key TEXT PRIMARY KEY, translation TEXT NOT NULL)")
+            connection.commit()
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _disabled(self, error):
+        print(f"Translation cache error: {error}, continuing in memory only")
+        self.path = None
+
+    def get_many(self, lines, version):
+        """line -> cached translation, for the lines that are cached"""
+        keys = {line: cache_key(line, version) for line in lines}
+        found = {}
+        for line, key in keys.items():
+            translation = self.memory.get(key)
+            if translation is not None:
+                found[line] = translation
+
+        missing = {key: line for line, key in keys.items() if line not in found}
+        if missing and self.path:
+            stored = {}
+            try:
+                with self._lock:
+                    connection = self._connect()
+                    missing_keys = list(missing)
+                    for start in range(0, len(missing_keys), MAX_QUERY_KEYS):
+                        chunk = missing_keys[start:start + MAX_QUERY_KEYS]
+                        rows = connection.execute(
+                            f"SELECT key, translation FROM translations WHERE key IN ({','.join('?' * len(chunk))})",
+                            chunk)
+                        stored.update(rows)
+            except sqlite3.Error as e:
+                self._disabled(e)
+            for key, translation in stored.items():
+                self.memory.put(key, translation)
+                found[missing[key]] = translation
+        return found
+
+    def put_many(self, translations, version):
+        """store line -> translation pairs, in one transaction"""
+        rows = [(cache_key(line, version), translation) for line, translation in translations.items()]
+        for key, translation in rows:
+            self.memory.put(key, translation)
+        if rows and self.path:
+            try:
+                with self._lock:
+                    connection = self._connect()
+                    with connection:
+                        connection.executemany(
+                            "INSERT OR REPLACE INTO translations (key, translation) VALUES (?, ?)", rows)
+            except sqlite3.Error as e:
+                self._disabled(e)
+
+    def get(self, line, version):
+        return self.get_many([line], version).get(line)
+
+    def put(self, line, version, translation):
+        self.put_many({line: translation}, version)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+# created on first use by get_translation_cache()
+translation_cache = None
+
+
+def get_translation_cache():
+    """the shared TranslationCache of this process"""
+    global translation_cache
+    if translation_cache is None:
+        translation_cache = TranslationCache()
+    return translation_cache
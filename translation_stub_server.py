@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an HTTP translation service, to test batching and
+latency without network access. POST /translate with
+{"q": [lines], "source": "id", "target": "en"} answers
+{"translations": [...]} (glossary.json terms) after --latency seconds,
+GET /stats returns the requests, lines and most requests in flight seen.
+
+    $ (venv) python translation_stub_server.py --port 8765 --latency 0.2
+    $ (venv) CHAT_TRANSLATION_BACKEND=http://127.0.0.1:8765/translate python app.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from glossary import get_glossary
+
+
+class StubTranslationHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.stats["requests"] += 1
+            server.in_flight += 1
+            server.stats["max_in_flight"] = max(server.stats["max_in_flight"], server.in_flight)
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                lines = json.loads(self.rfile.read(length))["q"]
+            except (ValueError, KeyError, TypeError):
+                self.send_json(400, {"error": "expected {\"q\": [lines]}"})
+                return
+            time.sleep(server.latency)
+            glossary = get_glossary("translation")
+            with server.lock:
+                server.stats["lines"] += len(lines)
+            self.send_json(200, {"translations": [glossary.translate(line.lower()) for line in lines]})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.send_json(200, dict(self.server.stats))
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_stub_server(port=0, latency=0.0):
+    """a stub server on 127.0.0.1 (port 0 picks a free one), not started yet"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubTranslationHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.stats = {"requests": 0, "lines": 0, "max_in_flight": 0}
+    return server
+
+
+def start_stub_server(port=0, latency=0.0):
+    """a stub server serving in a background thread, url is its endpoint"""
+    server = create_stub_server(port, latency)
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/translate"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for an HTTP translation service")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    args = parser.parse_args()
+
+    server = create_stub_server(args.port, args.latency)
+    print(f"Stub translation server on http://127.0.0.1:{args.port}/translate ({args.latency}s per request)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()